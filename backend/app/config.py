@@ -11,24 +11,88 @@ class Settings(BaseSettings):
     data_dir: Path = base_dir / "data"
     materials_dir: Path = data_dir / "materials"
     recordings_dir: Path = data_dir / "recordings"
+    clips_dir: Path = materials_dir / "clips"
+    cache_db_path: Path = data_dir / "cache.db"
 
     # Database
     database_url: str = f"sqlite+aiosqlite:///{data_dir}/shadowing.db"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # Bytes of the DB file memory-mapped
+    sqlite_busy_timeout_ms: int = 5000  # Wait this long for a lock before failing
 
     # Whisper settings
     whisper_model: str = "base"  # tiny, base, small, medium, large
     whisper_device: str = "cpu"  # cpu or cuda
     whisper_compute_type: str = "int8"  # float16, int8
+    whisper_cpu_threads: int = 0  # 0 = faster-whisper default
+    # Out-of-process inference server ("unix:/path.sock" or "tcp:host:port").
+    # Empty runs the model inside each web worker.
+    whisper_server_address: str = ""
+    whisper_replicas: int = 1  # Model replicas owned by the inference server
+    whisper_batch_size: int = 8  # Clips per batch for batched transcription
+    # Long-audio mode: audio at least this long (seconds) is split at silences
+    # and transcribed in parallel. 0 disables.
+    whisper_long_audio_seconds: float = 900.0
+    whisper_chunk_seconds: float = 120.0  # Target chunk length
+    whisper_chunk_workers: int = 2  # Parallel chunk processes (1 disables)
+    transcription_cache_max_bytes: int = 256 * 1024 * 1024
 
     # TTS settings
     tts_voice: str = "en-US-JennyNeural"  # Microsoft Edge TTS voice
     tts_rate: str = "+0%"  # Speech rate adjustment
+    tts_concurrency: int = 4  # Concurrent synthesis requests
+    tts_max_retries: int = 3  # Retries per segment on transient failures
+    tts_retry_backoff: float = 0.5  # Initial backoff in seconds (doubles)
+    # TTS cache budget; unreferenced files beyond it are evicted
+    tts_cache_max_bytes: int = 1024 * 1024 * 1024
+
+    # Uploads (larger request bodies are rejected with 413)
+    max_recording_upload_bytes: int = 50 * 1024 * 1024
+    max_pdf_upload_bytes: int = 100 * 1024 * 1024
+
+    # Segment clips
+    clip_concurrency: int = 4  # Concurrent ffmpeg processes cutting clips
+
+    # PDF import
+    pdf_segment_batch_size: int = 50  # Sentences synthesized and saved per batch
+    segment_insert_batch_size: int = 500  # Segment rows written per INSERT round-trip
 
     # LLM settings
     llm_provider: str = "ollama"  # ollama or claude
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.2"
     claude_api_key: str = ""
+    claude_base_url: str = "https://api.anthropic.com"
+    ollama_timeout: float = 60.0  # Seconds to wait for an Ollama response
+    claude_timeout: float = 60.0  # Seconds to wait for a Claude response
+    llm_connect_timeout: float = 5.0
+    llm_max_connections: int = 10  # Pooled connections shared by all evaluations
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry: float = 60.0  # Seconds an idle connection is kept
+
+    # Batch evaluation
+    evaluation_concurrency: int = 4  # Concurrent LLM calls per batch
+    evaluation_batch_max: int = 50  # Maximum practices per batch request
+
+    # Tiered evaluation: local accuracy at/above or below these skips the LLM
+    evaluation_local_above: float = 95.0  # Above 100 always uses the LLM
+    evaluation_local_below: float = 20.0  # 0 always uses the LLM
+
+    # Evaluation cache (LLM results keyed by texts, provider and model)
+    evaluation_cache_max_bytes: int = 32 * 1024 * 1024
+    evaluation_cache_ttl_seconds: float = 30 * 24 * 3600  # 0 = never expire
+
+    # Response cache (serialized material listings, checked against versions)
+    response_cache_max_bytes: int = 16 * 1024 * 1024
+
+    # Storage garbage collection (files of deleted materials and orphans)
+    storage_gc_batch_size: int = 100  # Queued files checked and removed per batch
+    storage_gc_sweep_interval: float = 6 * 3600  # Seconds between sweeps, 0 = off
+    storage_gc_grace_seconds: float = 24 * 3600  # Sweeps skip newer files
+
+    # Background jobs
+    job_workers: int = 2  # Concurrent import jobs (download/transcribe/save)
+    job_heartbeat_interval: float = 10.0  # Seconds between liveness updates
+    job_stale_seconds: float = 60.0  # Running jobs silent this long are taken over
 
     # CORS
     cors_origins: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
@@ -42,6 +106,7 @@ class Settings(BaseSettings):
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.materials_dir.mkdir(parents=True, exist_ok=True)
         self.recordings_dir.mkdir(parents=True, exist_ok=True)
+        self.clips_dir.mkdir(parents=True, exist_ok=True)
 
 
 settings = Settings()
@@ -1,11 +1,19 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
 from app.database import init_db
-from app.routers import materials, youtube, pdf, practice, evaluate
+from app.routers import (
+    materials, youtube, pdf, practice, evaluate, jobs, metrics, storage
+)
+from app.services.jobs import job_runner
+from app.services.llm import llm_client
+from app.services.media import MediaStaticFiles
+from app.services.storage import storage_gc
+from app.services.transcribe import TranscribeService
+from app.services.uploads import UploadLimitMiddleware
+from app.services.youtube import YOUTUBE_IMPORT_STAGES, YOUTUBE_TRANSIENT_STAGES
 
 
 @asynccontextmanager
@@ -14,9 +22,18 @@ async def lifespan(app: FastAPI):
     # Startup
     settings.ensure_directories()
     await init_db()
+    await llm_client.start()
+    job_runner.register(
+        "youtube", YOUTUBE_IMPORT_STAGES, transient=YOUTUBE_TRANSIENT_STAGES
+    )
+    await job_runner.start(settings.job_workers)
+    await storage_gc.start()
     yield
     # Shutdown
-    pass
+    await storage_gc.stop()
+    await job_runner.stop()
+    await llm_client.close()
+    TranscribeService.shutdown()
 
 
 app = FastAPI(
@@ -26,6 +43,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Upload size limits, enforced while the body streams in. Added before
+# CORS so that CORS wraps it and early 413 replies get CORS headers.
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        r"/api/segments/\d+/practice": settings.max_recording_upload_bytes,
+        r"/api/materials/pdf": settings.max_pdf_upload_bytes,
+    },
+)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -35,15 +62,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for audio/recordings
+# Mount static files for audio/recordings (Range, ETag and 304 support)
 app.mount(
     "/static/materials",
-    StaticFiles(directory=str(settings.materials_dir)),
+    MediaStaticFiles(directory=str(settings.materials_dir)),
     name="materials",
 )
 app.mount(
     "/static/recordings",
-    StaticFiles(directory=str(settings.recordings_dir)),
+    MediaStaticFiles(directory=str(settings.recordings_dir)),
     name="recordings",
 )
 
@@ -53,6 +80,9 @@ app.include_router(youtube.router)
 app.include_router(pdf.router)
 app.include_router(practice.router)
 app.include_router(evaluate.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
+app.include_router(storage.router)
 
 
 @app.get("/")
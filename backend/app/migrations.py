@@ -0,0 +1,113 @@
+"""Versioned schema migrations.
+
+``Base.metadata.create_all`` creates missing tables but never changes
+existing ones. Changes to databases that already exist are listed here
+in order and applied once each; the applied versions are recorded in the
+``schema_version`` table. Migrations must be safe to run on a database
+that create_all has just built (e.g. ``CREATE INDEX IF NOT EXISTS``).
+"""
+
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Connection, text
+
+
+def _add_lookup_indexes(conn: Connection) -> None:
+    """Indexes for segment ordering, practice history and job lookups."""
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_segments_material_order '
+        'ON segments (material_id, "order")'
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_practices_segment_created "
+        "ON practices (segment_id, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_materials_created_at "
+        "ON materials (created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_jobs_kind_status ON jobs (kind, status)"
+    ))
+
+
+def _add_material_versions(conn: Connection) -> None:
+    """Change counters per material (0 = the library) for response caching."""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS material_versions ("
+        "material_id INTEGER PRIMARY KEY, "
+        "version INTEGER NOT NULL, "
+        "updated_at DATETIME NOT NULL)"
+    ))
+
+
+def _add_material_status(conn: Connection) -> None:
+    """Import status, so half-imported materials can be hidden."""
+    columns = {
+        row[1] for row in conn.execute(text("PRAGMA table_info(materials)"))
+    }
+    if "status" not in columns:
+        conn.execute(text(
+            "ALTER TABLE materials "
+            "ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'ready'"
+        ))
+
+
+def _add_job_claims(conn: Connection) -> None:
+    """Owner and heartbeat, so only one worker runs each job."""
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(jobs)"))}
+    if "owner" not in columns:
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN owner VARCHAR(64)"))
+    if "heartbeat" not in columns:
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN heartbeat DATETIME"))
+
+
+def _prune_finished_job_transcripts(conn: Connection) -> None:
+    """Drop transcripts kept on finished imports; they live in segments."""
+    conn.execute(text(
+        "UPDATE jobs SET state = json_remove(state, '$.transcribe') "
+        "WHERE kind = 'youtube' AND status IN ('completed', 'failed') "
+        "AND json_type(state, '$.transcribe') IS NOT NULL"
+    ))
+
+
+# (version, description, migration) in the order they must be applied
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Add lookup indexes", _add_lookup_indexes),
+    (2, "Add material version counters", _add_material_versions),
+    (3, "Add material import status", _add_material_status),
+    (4, "Add job owner and heartbeat", _add_job_claims),
+    (5, "Prune transcripts of finished jobs", _prune_finished_job_transcripts),
+]
+
+
+def run_migrations(conn: Connection) -> list[int]:
+    """Apply pending migrations in order. Returns the versions applied."""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, "
+        "description TEXT NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    ))
+    applied = set(conn.execute(text("SELECT version FROM schema_version")).scalars())
+
+    newly_applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate(conn)
+        conn.execute(
+            text(
+                "INSERT INTO schema_version (version, description, applied_at) "
+                "VALUES (:version, :description, :applied_at)"
+            ),
+            {
+                "version": version,
+                "description": description,
+                "applied_at": datetime.utcnow(),
+            },
+        )
+        newly_applied.append(version)
+
+    return newly_applied
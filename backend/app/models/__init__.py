@@ -1,5 +1,6 @@
 from app.models.material import Material
 from app.models.segment import Segment
 from app.models.practice import Practice
+from app.models.job import Job
 
-__all__ = ["Material", "Segment", "Practice"]
+__all__ = ["Material", "Segment", "Practice", "Job"]
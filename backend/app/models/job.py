@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import String, Float, Integer, Text, DateTime, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Job(Base):
+    """Job (バックグラウンド処理) model."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_kind_status", "kind", "status"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # youtube
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="pending"
+    )  # pending, running, completed, failed
+    stage: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Output of every finished stage, keyed by stage name
+    state: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Runner that claimed the job, and when it last reported being alive
+    owner: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    heartbeat: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    material_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}', stage='{self.stage}')>"
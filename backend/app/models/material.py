@@ -17,13 +17,19 @@ class Material(Base):
     audio_path: Mapped[str] = mapped_column(String(500), nullable=False)
     duration: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
     thumbnail_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="ready", server_default="ready"
+    )  # importing, ready
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, nullable=False, default=datetime.utcnow
+        DateTime, nullable=False, default=datetime.utcnow, index=True
     )
 
     # Relationships
     segments: Mapped[list["Segment"]] = relationship(
-        "Segment", back_populates="material", cascade="all, delete-orphan"
+        "Segment",
+        back_populates="material",
+        cascade="all, delete-orphan",
+        order_by="Segment.order",
     )
 
     def __repr__(self) -> str:
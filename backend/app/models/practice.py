@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, JSON
+from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +9,9 @@ class Practice(Base):
     """Practice (練習記録) model."""
 
     __tablename__ = "practices"
+    __table_args__ = (
+        Index("ix_practices_segment_created", "segment_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     segment_id: Mapped[int] = mapped_column(
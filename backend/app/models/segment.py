@@ -1,4 +1,4 @@
-from sqlalchemy import String, Float, Integer, ForeignKey, Text
+from sqlalchemy import String, Float, Integer, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -8,6 +8,7 @@ class Segment(Base):
     """Segment (セグメント/文単位) model."""
 
     __tablename__ = "segments"
+    __table_args__ = (Index("ix_segments_material_order", "material_id", "order"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     material_id: Mapped[int] = mapped_column(
@@ -1,11 +1,16 @@
+import asyncio
+import json
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, async_session
 from app.models import Practice, Segment
+from app.services.audio import AudioService
 from app.services.transcribe import TranscribeService
 from app.services.evaluator import EvaluatorService
 
@@ -27,6 +32,157 @@ class EvaluationResponse(BaseModel):
     evaluation: dict
 
 
+class BatchEvaluationRequest(BaseModel):
+    """Batch evaluation request schema."""
+
+    practice_ids: list[int]
+    stream: bool = False  # Stream NDJSON results as each item finishes
+
+
+class BatchEvaluationItem(BaseModel):
+    """Result of evaluating one practice in a batch."""
+
+    practice_id: int
+    transcribed_text: str | None = None
+    original_text: str | None = None
+    evaluation: dict | None = None
+    error: str | None = None
+
+
+class BatchEvaluationResponse(BaseModel):
+    """Batch evaluation response schema."""
+
+    results: list[BatchEvaluationItem]
+
+
+@router.post("/evaluate-batch", response_model=BatchEvaluationResponse)
+async def evaluate_batch(
+    request: BatchEvaluationRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Evaluate several practice recordings at once.
+
+    Recordings are transcribed together in one batched Whisper pass and the
+    LLM evaluations run concurrently (up to ``evaluation_concurrency``).
+    With ``stream`` set, results are sent as NDJSON lines as they finish.
+    """
+    practice_ids = list(dict.fromkeys(request.practice_ids))
+    if not practice_ids:
+        raise HTTPException(status_code=400, detail="No practice IDs given")
+    if len(practice_ids) > settings.evaluation_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.evaluation_batch_max} practices per batch",
+        )
+
+    result = await db.execute(
+        select(Practice)
+        .options(selectinload(Practice.segment))
+        .where(Practice.id.in_(practice_ids))
+    )
+    practices = {practice.id: practice for practice in result.scalars().all()}
+    found = [practices[pid] for pid in practice_ids if pid in practices]
+
+    try:
+        audio_service = AudioService()
+        sources = await asyncio.gather(*[
+            audio_service.transcription_source(practice.recording_path)
+            for practice in found
+        ])
+        transcriptions = await TranscribeService().transcribe_batch(list(sources))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    items = _evaluate_items(
+        [
+            (practice.id, practice.segment.text, transcription["text"])
+            for practice, transcription in zip(found, transcriptions)
+            if "error" not in transcription
+        ]
+    )
+    # Practices that were not found or whose recording could not be read
+    failed = [
+        BatchEvaluationItem(practice_id=pid, error="Practice not found")
+        for pid in practice_ids
+        if pid not in practices
+    ]
+    failed += [
+        BatchEvaluationItem(
+            practice_id=practice.id,
+            original_text=practice.segment.text,
+            error=transcription["error"],
+        )
+        for practice, transcription in zip(found, transcriptions)
+        if "error" in transcription
+    ]
+
+    if request.stream:
+        async def stream_results():
+            for item in failed:
+                yield item.model_dump_json() + "\n"
+            async for item in items:
+                yield item.model_dump_json() + "\n"
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    results = {item.practice_id: item for item in failed}
+    async for item in items:
+        results[item.practice_id] = item
+
+    return BatchEvaluationResponse(results=[results[pid] for pid in practice_ids])
+
+
+async def _evaluate_items(items: list[tuple[int, str, str]]):
+    """Run LLM evaluations concurrently and save each as it finishes.
+
+    Args:
+        items: (practice_id, original_text, transcribed_text) tuples
+    """
+    evaluator_service = EvaluatorService()
+    semaphore = asyncio.Semaphore(max(settings.evaluation_concurrency, 1))
+
+    async def evaluate_one(
+        practice_id: int, original_text: str, transcribed_text: str
+    ) -> BatchEvaluationItem:
+        try:
+            async with semaphore:
+                evaluation = await evaluator_service.evaluate(
+                    original_text=original_text,
+                    transcribed_text=transcribed_text,
+                )
+
+            async with async_session() as db:
+                await db.execute(
+                    update(Practice)
+                    .where(Practice.id == practice_id)
+                    .values(transcribed_text=transcribed_text, evaluation=evaluation)
+                )
+                await db.commit()
+
+            return BatchEvaluationItem(
+                practice_id=practice_id,
+                transcribed_text=transcribed_text,
+                original_text=original_text,
+                evaluation=evaluation,
+            )
+
+        except Exception as e:
+            return BatchEvaluationItem(
+                practice_id=practice_id,
+                transcribed_text=transcribed_text,
+                original_text=original_text,
+                error=str(e),
+            )
+
+    tasks = [asyncio.create_task(evaluate_one(*item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 @router.post("/{practice_id}/evaluate", response_model=EvaluationResponse)
 async def evaluate_practice(
     practice_id: int,
@@ -47,9 +203,9 @@ async def evaluate_practice(
     evaluator_service = EvaluatorService()
 
     try:
-        # Transcribe the recording
+        # Transcribe the recording (pre-normalized WAV when ready)
         transcription = await transcribe_service.transcribe_single(
-            practice.recording_path
+            await AudioService().transcription_source(practice.recording_path)
         )
         transcribed_text = transcription["text"]
 
@@ -76,3 +232,77 @@ async def evaluate_practice(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{practice_id}/evaluate/stream")
+async def evaluate_practice_stream(
+    practice_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Evaluate practice recording, streaming results as Server-Sent Events.
+
+    Events in order: ``transcription`` as soon as Whisper finishes,
+    ``accuracy`` with the local similarity score, ``token`` chunks of LLM
+    output as they arrive (Ollama), and ``evaluation`` (shaped like
+    EvaluationResponse) once the result is saved. Failures end the stream
+    with an ``error`` event.
+    """
+    result = await db.execute(
+        select(Practice)
+        .options(selectinload(Practice.segment))
+        .where(Practice.id == practice_id)
+    )
+    practice = result.scalar_one_or_none()
+
+    if not practice:
+        raise HTTPException(status_code=404, detail="Practice not found")
+
+    recording_path = await AudioService().transcription_source(
+        practice.recording_path
+    )
+    original_text = practice.segment.text
+
+    async def events():
+        try:
+            transcription = await TranscribeService().transcribe_single(recording_path)
+            transcribed_text = transcription["text"]
+            yield _sse_event("transcription", {
+                "practice_id": practice_id,
+                "transcribed_text": transcribed_text,
+                "original_text": original_text,
+            })
+
+            async for event, data in EvaluatorService().evaluate_stream(
+                original_text, transcribed_text
+            ):
+                if event == "evaluation":
+                    async with async_session() as session:
+                        await session.execute(
+                            update(Practice)
+                            .where(Practice.id == practice_id)
+                            .values(transcribed_text=transcribed_text, evaluation=data)
+                        )
+                        await session.commit()
+
+                    data = EvaluationResponse(
+                        practice_id=practice_id,
+                        transcribed_text=transcribed_text,
+                        original_text=original_text,
+                        evaluation=data,
+                    ).model_dump()
+
+                yield _sse_event(event, data)
+
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from datetime import datetime
+
+from app.database import get_db
+from app.models import Job
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+class JobResponse(BaseModel):
+    """Job status response schema."""
+
+    id: int
+    kind: str
+    status: str
+    stage: str | None
+    progress: float
+    material_id: int | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get job status and progress."""
+    job = await db.get(Job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
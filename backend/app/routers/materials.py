@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import base64
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, select, tuple_
 from pydantic import BaseModel
 from datetime import datetime
+from pathlib import Path
 
 from app.database import get_db
-from app.models import Material, Segment
+from app.models import Material, Practice, Segment
+from app.services.response_cache import LIBRARY, response_cache
+from app.services.storage import storage_gc
+from app.services.waveform import WaveformService
 
 router = APIRouter(prefix="/api/materials", tags=["materials"])
 
@@ -41,36 +47,208 @@ class SegmentResponse(BaseModel):
         from_attributes = True
 
 
-class MaterialDetailResponse(MaterialResponse):
-    """Material detail with segments."""
+class MaterialSummaryResponse(MaterialResponse):
+    """Material with aggregate counts."""
+
+    segment_count: int
+    practice_count: int
+
+
+class MaterialPage(BaseModel):
+    """One page of materials, newest first."""
+
+    items: list[MaterialSummaryResponse]
+    next_cursor: str | None  # Pass as ``cursor`` to get the next page
+
+
+class SegmentPage(BaseModel):
+    """One page of a material's segments in order."""
+
+    items: list[SegmentResponse]
+    next_after_order: int | None  # Pass as ``after_order`` to get the next page
+
+
+class MaterialDetailResponse(MaterialSummaryResponse):
+    """Material detail with the first page of its segments."""
 
     segments: list[SegmentResponse]
+    next_after_order: int | None
 
 
-@router.get("", response_model=list[MaterialResponse])
-async def list_materials(db: AsyncSession = Depends(get_db)):
-    """Get all materials."""
-    result = await db.execute(
-        select(Material).order_by(Material.created_at.desc())
+class WaveformResponse(BaseModel):
+    """Waveform peaks for a time window of a material's audio."""
+
+    start: float
+    end: float
+    duration: float
+    points: int
+    min: list[float]  # Per-point minimum, -1.0 - 1.0
+    max: list[float]  # Per-point maximum, -1.0 - 1.0
+
+
+def _encode_cursor(created_at: datetime, material_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{material_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, material_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), int(material_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _summary_query():
+    """Material columns with segment/practice counts as one aggregate query."""
+    segment_count = (
+        select(func.count(Segment.id))
+        .where(Segment.material_id == Material.id)
+        .correlate(Material)
+        .scalar_subquery()
+    )
+    practice_count = (
+        select(func.count(Practice.id))
+        .join(Segment, Practice.segment_id == Segment.id)
+        .where(Segment.material_id == Material.id)
+        .correlate(Material)
+        .scalar_subquery()
     )
-    materials = result.scalars().all()
-    return materials
+    # Materials still being imported are hidden until they are complete
+    return select(
+        *Material.__table__.columns,
+        segment_count.label("segment_count"),
+        practice_count.label("practice_count"),
+    ).where(Material.status == "ready")
 
 
-@router.get("/{material_id}", response_model=MaterialDetailResponse)
-async def get_material(material_id: int, db: AsyncSession = Depends(get_db)):
-    """Get material by ID with segments."""
-    result = await db.execute(
-        select(Material)
-        .options(selectinload(Material.segments))
-        .where(Material.id == material_id)
+async def _segment_page(
+    db: AsyncSession, material_id: int, after_order: int | None, limit: int
+) -> dict:
+    query = select(*Segment.__table__.columns).where(
+        Segment.material_id == material_id
     )
-    material = result.scalar_one_or_none()
+    if after_order is not None:
+        query = query.where(Segment.order > after_order)
+    result = await db.execute(query.order_by(Segment.order).limit(limit + 1))
+    rows = result.mappings().all()
+
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_after_order": items[-1]["order"] if len(rows) > limit else None,
+    }
+
+
+@router.get("", response_model=MaterialPage)
+async def list_materials(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get materials newest first, one page at a time."""
+    query = _summary_query()
+    if cursor:
+        created_at, material_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(Material.created_at, Material.id) < tuple_(created_at, material_id)
+        )
+
+    async def build() -> bytes:
+        result = await db.execute(
+            query.order_by(Material.created_at.desc(), Material.id.desc()).limit(
+                limit + 1
+            )
+        )
+        rows = result.mappings().all()
+
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = _encode_cursor(items[-1]["created_at"], items[-1]["id"])
+        page = MaterialPage(items=items, next_cursor=next_cursor)
+        return page.model_dump_json().encode()
+
+    return await response_cache.respond(request, db, LIBRARY, build)
+
+
+@router.get("/{material_id}", response_model=MaterialDetailResponse)
+async def get_material(
+    material_id: int,
+    request: Request,
+    segment_limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get material by ID with counts and the first page of segments."""
+
+    async def build() -> bytes:
+        result = await db.execute(_summary_query().where(Material.id == material_id))
+        material = result.mappings().one_or_none()
+
+        if not material:
+            raise HTTPException(status_code=404, detail="Material not found")
+
+        page = await _segment_page(db, material_id, None, segment_limit)
+        detail = MaterialDetailResponse(
+            **material,
+            segments=page["items"],
+            next_after_order=page["next_after_order"],
+        )
+        return detail.model_dump_json().encode()
+
+    return await response_cache.respond(request, db, material_id, build)
+
+
+@router.get("/{material_id}/segments", response_model=SegmentPage)
+async def list_segments(
+    material_id: int,
+    request: Request,
+    after_order: int | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a material's segments in order, after ``after_order``."""
+
+    async def build() -> bytes:
+        exists = await db.scalar(
+            select(Material.id).where(
+                Material.id == material_id, Material.status == "ready"
+            )
+        )
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Material not found")
+
+        page = await _segment_page(db, material_id, after_order, limit)
+        return SegmentPage(**page).model_dump_json().encode()
+
+    return await response_cache.respond(request, db, material_id, build)
+
+
+@router.get("/{material_id}/waveform", response_model=WaveformResponse)
+async def get_waveform(
+    material_id: int,
+    start: float = Query(0.0, ge=0),
+    end: float | None = Query(None, ge=0),
+    points: int = Query(1000, ge=1, le=WaveformService.MAX_POINTS),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get min/max waveform peaks of the material audio between two times."""
+    material = await db.get(Material, material_id)
 
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
+    if not material.audio_path or not Path(material.audio_path).exists():
+        raise HTTPException(status_code=404, detail="Audio not available")
 
-    return material
+    try:
+        return await WaveformService().get_peaks(
+            material.audio_path, start=start, end=end, points=points
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/{material_id}")
@@ -84,9 +262,13 @@ async def delete_material(material_id: int, db: AsyncSession = Depends(get_db)):
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
 
-    # TODO: Delete associated files from disk
+    files = await storage_gc.material_files(db, material_id)
 
+    await response_cache.bump(db, material_id)
     await db.delete(material)
     await db.commit()
 
+    # Removed in the background, skipping files other materials still use
+    storage_gc.enqueue(files)
+
     return {"message": "Material deleted successfully"}
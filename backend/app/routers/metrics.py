@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from app.services.evaluator import evaluation_cache, evaluation_tiers
+from app.services.llm import llm_client
+from app.services.response_cache import response_cache
+from app.services.storage import storage_gc
+from app.services.transcribe import transcription_cache
+from app.services.tts import tts_cache
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """Get cache and performance counters for this worker process."""
+    return {
+        "transcription_cache": transcription_cache.stats(),
+        "tts_cache": tts_cache.stats(),
+        "evaluation_cache": evaluation_cache.stats(),
+        "evaluation_tiers": evaluation_tiers.stats(),
+        "llm": llm_client.stats(),
+        "response_cache": response_cache.stats(),
+        "storage_gc": storage_gc.stats(),
+    }
@@ -1,11 +1,12 @@
 import traceback
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.database import get_db
 from app.services.pdf import PdfService
-from app.services.tts import TtsService
+from app.services.tts import TtsService, tts_cache
+from app.services.uploads import UploadTooLargeError
 
 router = APIRouter(prefix="/api/materials/pdf", tags=["pdf"])
 
@@ -21,6 +22,7 @@ class PdfImportResponse(BaseModel):
 
 @router.post("", response_model=PdfImportResponse)
 async def import_pdf(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
 ):
@@ -32,35 +34,33 @@ async def import_pdf(
     tts_service = TtsService()
 
     try:
-        # Extract text from PDF
-        text_segments = await pdf_service.extract_text(file)
+        # Spool the upload to disk, then read, synthesize and save in batches
+        try:
+            pdf_path = await pdf_service.spool(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        try:
+            material, segment_count = await pdf_service.import_document(
+                db=db,
+                pdf_path=pdf_path,
+                title=file.filename.replace(".pdf", ""),
+                tts_service=tts_service,
+            )
+        finally:
+            pdf_path.unlink(missing_ok=True)
 
-        # Generate TTS audio for each segment
-        audio_segments = await tts_service.generate_audio_segments(text_segments)
-
-        # Calculate total duration from segments
-        total_duration = sum(seg["duration"] for seg in audio_segments)
-
-        # Use first segment's audio as material audio (for compatibility)
-        # Individual segment audios are used for practice
-        material_audio_path = audio_segments[0]["audio_path"] if audio_segments else ""
-
-        # Save to database
-        material = await pdf_service.save_material(
-            db=db,
-            title=file.filename.replace(".pdf", ""),
-            audio_path=material_audio_path,
-            duration=total_duration,
-            segments=audio_segments,
-        )
+        # Trim the TTS cache once the new segments reference their files
+        background_tasks.add_task(tts_cache.evict)
 
         return PdfImportResponse(
             material_id=material.id,
             title=material.title,
-            segment_count=len(audio_segments),
+            segment_count=segment_count,
             message="Successfully imported PDF with TTS audio",
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         error_detail = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"
         print(f"PDF Import Error: {error_detail}")
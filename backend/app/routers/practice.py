@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from pydantic import BaseModel
 from datetime import datetime
 from pathlib import Path
 
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import get_db, async_session
 from app.models import Segment, Practice, Material
 from app.config import settings
+from app.services.audio import AudioService
+from app.services.media import audio_media_type, media_response
+from app.services.response_cache import response_cache
+from app.services.uploads import UploadTooLargeError, spool_upload
 
 router = APIRouter(prefix="/api", tags=["practice"])
 
@@ -30,8 +35,22 @@ class PracticeResponse(BaseModel):
 
 
 @router.get("/segments/{segment_id}/audio")
-async def get_segment_audio(segment_id: int, db: AsyncSession = Depends(get_db)):
-    """Get audio file for a segment."""
+async def get_segment_audio(
+    segment_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    full: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """Get audio file for a segment.
+
+    By default the segment's own clip is served (TTS audio or a cut
+    YouTube clip); a segment without one has it cut first. With ``full``
+    the material audio is served instead, for clients that play the
+    segment as a region of it, and a missing clip is cut in the background
+    for later requests. Either way the response is what the client asked
+    for, whatever the segment's state when it loaded the material.
+    """
     result = await db.execute(
         select(Segment)
         .options(selectinload(Segment.material))
@@ -42,38 +61,91 @@ async def get_segment_audio(segment_id: int, db: AsyncSession = Depends(get_db))
     if not segment:
         raise HTTPException(status_code=404, detail="Segment not found")
 
-    # For TTS segments (PDF), use segment audio
+    material_path = None
+    if segment.material and segment.material.audio_path:
+        material_path = Path(segment.material.audio_path)
+        if not material_path.exists():
+            material_path = None
+
+    if full:
+        if material_path is None:
+            raise HTTPException(status_code=404, detail="Audio not available")
+        if not segment.audio_path:
+            background_tasks.add_task(
+                _cut_segment_clip,
+                segment.material_id,
+                segment.id,
+                str(material_path),
+                segment.start_time,
+                segment.end_time,
+            )
+        return await media_response(
+            request, material_path, audio_media_type(material_path)
+        )
+
+    # For TTS segments (PDF) and clipped YouTube segments, use segment audio
     if segment.audio_path:
         path = Path(segment.audio_path)
         if path.exists():
-            return FileResponse(path, media_type="audio/mpeg")
-
-    # For YouTube segments, use the material's main audio file
-    if segment.material and segment.material.audio_path:
-        path = Path(segment.material.audio_path)
-        if path.exists():
-            # Determine media type based on file extension
-            ext = path.suffix.lower()
-            media_types = {
-                ".mp3": "audio/mpeg",
-                ".m4a": "audio/mp4",
-                ".wav": "audio/wav",
-                ".webm": "audio/webm",
-                ".ogg": "audio/ogg",
-            }
-            media_type = media_types.get(ext, "audio/mpeg")
-            return FileResponse(path, media_type=media_type)
+            return await media_response(request, path, audio_media_type(path))
+
+    # Otherwise cut the clip from the material audio now
+    if material_path is not None:
+        clip_path = await _cut_segment_clip(
+            segment.material_id,
+            segment.id,
+            str(material_path),
+            segment.start_time,
+            segment.end_time,
+        )
+        if clip_path:
+            path = Path(clip_path)
+            return await media_response(request, path, audio_media_type(path))
 
     raise HTTPException(status_code=404, detail="Audio not available")
 
 
+async def _cut_segment_clip(
+    material_id: int,
+    segment_id: int,
+    source_path: str,
+    start_time: float,
+    end_time: float,
+) -> str | None:
+    """Cut a segment's clip and store it on the segment if it has none.
+
+    Returns the clip path, or None if cutting failed.
+    """
+    try:
+        clip_path = await AudioService().extract_clip(source_path, start_time, end_time)
+    except Exception as e:
+        print(f"Clip Error (segment {segment_id}): {e}")
+        return None
+
+    async with async_session() as db:
+        result = await db.execute(
+            update(Segment)
+            .where(Segment.id == segment_id, Segment.audio_path.is_(None))
+            .values(audio_path=clip_path)
+        )
+        if result.rowcount:
+            await response_cache.bump(db, material_id)
+        await db.commit()
+
+    return clip_path
+
+
 @router.post("/segments/{segment_id}/practice", response_model=PracticeResponse)
 async def upload_practice(
     segment_id: int,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
 ):
-    """Upload practice recording."""
+    """Upload practice recording.
+
+    The recording is normalized for Whisper in the background; evaluation
+    waits for it.
+    """
     result = await db.execute(select(Segment).where(Segment.id == segment_id))
     segment = result.scalar_one_or_none()
 
@@ -86,9 +158,12 @@ async def upload_practice(
     filename = f"practice_{segment_id}_{timestamp}.webm"
     recording_path = settings.recordings_dir / filename
 
-    content = await file.read()
-    with open(recording_path, "wb") as f:
-        f.write(content)
+    try:
+        await spool_upload(
+            file, recording_path, max_bytes=settings.max_recording_upload_bytes
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     # Create practice record
     practice = Practice(
@@ -96,9 +171,12 @@ async def upload_practice(
         recording_path=str(recording_path),
     )
     db.add(practice)
+    await response_cache.bump(db, segment.material_id)
     await db.commit()
     await db.refresh(practice)
 
+    AudioService().start_normalize(str(recording_path))
+
     return practice
 
 
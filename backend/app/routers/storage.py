@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from app.services.storage import storage_gc
+
+router = APIRouter(prefix="/api/storage", tags=["storage"])
+
+
+class OrphanFile(BaseModel):
+    """A file no material, segment or practice references."""
+
+    path: str
+    size: int
+
+
+class SweepReport(BaseModel):
+    """Result of an orphan sweep."""
+
+    dry_run: bool
+    stale_imports: int  # Materials whose import never finished
+    scanned_files: int
+    orphan_files: int
+    orphan_bytes: int
+    orphans: list[OrphanFile]  # At most StorageGC.REPORT_LIMIT entries
+    removed_files: int
+    reclaimed_bytes: int
+
+
+@router.get("/gc", response_model=SweepReport)
+async def get_gc_report():
+    """List orphaned media files without removing them (dry run)."""
+    return await storage_gc.sweep(dry_run=True)
+
+
+@router.post("/gc", response_model=SweepReport)
+async def run_gc():
+    """Remove orphaned media files now."""
+    return await storage_gc.sweep()
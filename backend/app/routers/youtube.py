@@ -1,11 +1,11 @@
 import traceback
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel
 
 from app.database import get_db
+from app.services.jobs import job_runner
 from app.services.youtube import YouTubeService
-from app.services.transcribe import TranscribeService
 
 router = APIRouter(prefix="/api/materials/youtube", tags=["youtube"])
 
@@ -19,42 +19,59 @@ class YouTubeImportRequest(BaseModel):
 class YouTubeImportResponse(BaseModel):
     """YouTube import response schema."""
 
-    material_id: int
-    title: str
+    job_id: int
+    status: str
+    material_id: int | None = None
     message: str
 
 
-@router.post("", response_model=YouTubeImportResponse)
+@router.post("", response_model=YouTubeImportResponse, status_code=202)
 async def import_youtube(
     request: YouTubeImportRequest,
     db: AsyncSession = Depends(get_db),
 ):
-    """Import video from YouTube URL."""
+    """Queue a YouTube import job.
+
+    Download, transcription and saving run in the background; poll
+    ``GET /api/jobs/{job_id}`` for progress and the resulting material.
+    A video that was already imported is reused without downloading or
+    transcribing it again.
+    """
     youtube_service = YouTubeService()
-    transcribe_service = TranscribeService()
+    video_id = youtube_service.extract_video_id(request.url)
+    payload = {"url": request.url, "video_id": video_id}
 
     try:
-        # Download audio from YouTube
-        download_result = await youtube_service.download(request.url)
-
-        # Transcribe audio to get segments
-        segments = await transcribe_service.transcribe(download_result["audio_path"])
-
-        # Save to database
-        material = await youtube_service.save_material(
-            db=db,
-            title=download_result["title"],
-            source_url=request.url,
-            audio_path=download_result["audio_path"],
-            duration=download_result["duration"],
-            thumbnail_path=download_result.get("thumbnail_path"),
-            segments=segments,
-        )
+        if video_id:
+            existing = await youtube_service.find_material(db, video_id)
+            if existing:
+                material = await youtube_service.clone_material(
+                    db, existing, request.url
+                )
+                job = await job_runner.record_completed(
+                    db, "youtube", payload, {"material_id": material.id}
+                )
+                return YouTubeImportResponse(
+                    job_id=job.id,
+                    status=job.status,
+                    material_id=material.id,
+                    message="Reused previously imported video",
+                )
+
+            active = await job_runner.find_active(db, "youtube", video_id=video_id)
+            if active:
+                return YouTubeImportResponse(
+                    job_id=active.id,
+                    status=active.status,
+                    message="Import of this video is already in progress",
+                )
+
+        job = await job_runner.create_job(db, "youtube", payload)
 
         return YouTubeImportResponse(
-            material_id=material.id,
-            title=material.title,
-            message="Successfully imported from YouTube",
+            job_id=job.id,
+            status=job.status,
+            message="YouTube import queued",
         )
 
     except Exception as e:
@@ -0,0 +1,183 @@
+import re
+
+# Words are runs of letters/digits, with apostrophes inside them ("don't")
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized (casefolded, punctuation-free) words."""
+    return WORD_PATTERN.findall(text.casefold())
+
+
+def align_words(reference: list[str], hypothesis: list[str]) -> list[dict]:
+    """Align two word sequences with minimum edit distance.
+
+    Returns one entry per alignment step, in order:
+    ``{"op": "match" | "substitution" | "deletion" | "insertion",
+    "reference": word | None, "hypothesis": word | None}``. Deletions are
+    reference words that were not spoken; insertions are extra words.
+    """
+    opcodes = _word_opcodes(reference, hypothesis)
+
+    words = []
+    for tag, ref_start, ref_end, hyp_start, hyp_end in opcodes:
+        if tag == "equal":
+            words.extend(
+                {"op": "match", "reference": ref, "hypothesis": hyp}
+                for ref, hyp in zip(
+                    reference[ref_start:ref_end], hypothesis[hyp_start:hyp_end]
+                )
+            )
+        elif tag == "replace":
+            words.extend(
+                {"op": "substitution", "reference": ref, "hypothesis": hyp}
+                for ref, hyp in zip(
+                    reference[ref_start:ref_end], hypothesis[hyp_start:hyp_end]
+                )
+            )
+        elif tag == "delete":
+            words.extend(
+                {"op": "deletion", "reference": ref, "hypothesis": None}
+                for ref in reference[ref_start:ref_end]
+            )
+        elif tag == "insert":
+            words.extend(
+                {"op": "insertion", "reference": None, "hypothesis": hyp}
+                for hyp in hypothesis[hyp_start:hyp_end]
+            )
+    return words
+
+
+def score(original: str, transcribed: str) -> dict:
+    """Word-level comparison of a transcription against the original text.
+
+    Returns the per-word alignment, counts per operation, word and
+    character error rates (WER/CER, relative to the original) and an
+    accuracy score of ``(1 - WER) * 100`` clamped to 0 - 100.
+    """
+    reference = tokenize(original)
+    hypothesis = tokenize(transcribed)
+    words = align_words(reference, hypothesis)
+
+    counts = {"match": 0, "substitution": 0, "deletion": 0, "insertion": 0}
+    for word in words:
+        counts[word["op"]] += 1
+
+    errors = counts["substitution"] + counts["deletion"] + counts["insertion"]
+    wer = errors / len(reference) if reference else float(bool(hypothesis))
+
+    reference_chars = " ".join(reference)
+    hypothesis_chars = " ".join(hypothesis)
+    cer = (
+        edit_distance(reference_chars, hypothesis_chars) / len(reference_chars)
+        if reference_chars
+        else float(bool(hypothesis_chars))
+    )
+
+    return {
+        "accuracy": round(max(0.0, 1.0 - wer) * 100, 1),
+        "wer": round(wer, 4),
+        "cer": round(cer, 4),
+        "counts": counts,
+        "words": words,
+    }
+
+
+def edit_distance(a, b) -> int:
+    """Levenshtein distance between two sequences."""
+    try:
+        from rapidfuzz.distance import Levenshtein
+
+        return Levenshtein.distance(a, b)
+    except ImportError:
+        pass
+
+    import numpy as np
+
+    a_ids, b_ids = _encode(a, b)
+    previous = np.arange(len(b_ids) + 1)
+    for i in range(1, len(a_ids) + 1):
+        previous = _next_row(previous, a_ids[i - 1], b_ids, i)
+    return int(previous[-1])
+
+
+def _word_opcodes(reference: list[str], hypothesis: list[str]) -> list[tuple]:
+    """Edit opcodes (difflib style) turning reference into hypothesis."""
+    try:
+        from rapidfuzz.distance import Levenshtein
+
+        return [
+            tuple(opcode) for opcode in Levenshtein.opcodes(reference, hypothesis)
+        ]
+    except ImportError:
+        return _dp_opcodes(reference, hypothesis)
+
+
+def _encode(a, b) -> tuple:
+    """Map sequence items to integer ids shared by both sequences."""
+    import numpy as np
+
+    vocabulary: dict = {}
+    a_ids = [vocabulary.setdefault(x, len(vocabulary)) for x in a]
+    b_ids = [vocabulary.setdefault(x, len(vocabulary)) for x in b]
+    return np.array(a_ids, dtype=np.int64), np.array(b_ids, dtype=np.int64)
+
+
+def _next_row(previous, a_id: int, b_ids, i: int):
+    """Next row of the Levenshtein DP matrix, vectorized over ``b``.
+
+    Substitutions and deletions depend only on the previous row. The
+    insertion chain along the row, ``row[j] = min(row[j], row[j-1] + 1)``,
+    is resolved with a running minimum of ``row[k] - k``.
+    """
+    import numpy as np
+
+    row = np.empty_like(previous)
+    row[0] = i
+    row[1:] = np.minimum(previous[1:] + 1, previous[:-1] + (b_ids != a_id))
+    offsets = np.arange(len(row))
+    return np.minimum.accumulate(row - offsets) + offsets
+
+
+def _dp_opcodes(reference: list[str], hypothesis: list[str]) -> list[tuple]:
+    """Levenshtein alignment with a NumPy DP and backtrace (fallback)."""
+    import numpy as np
+
+    ref_ids, hyp_ids = _encode(reference, hypothesis)
+    rows, cols = len(ref_ids) + 1, len(hyp_ids) + 1
+    matrix = np.empty((rows, cols), dtype=np.int32)
+    matrix[0] = np.arange(cols)
+    for i in range(1, rows):
+        matrix[i] = _next_row(matrix[i - 1], ref_ids[i - 1], hyp_ids, i)
+
+    # Backtrace from the end, preferring matches/substitutions
+    steps = []
+    i, j = rows - 1, cols - 1
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            same = ref_ids[i - 1] == hyp_ids[j - 1]
+            if matrix[i, j] == matrix[i - 1, j - 1] + (0 if same else 1):
+                steps.append("equal" if same else "replace")
+                i, j = i - 1, j - 1
+                continue
+        if i > 0 and matrix[i, j] == matrix[i - 1, j] + 1:
+            steps.append("delete")
+            i -= 1
+        else:
+            steps.append("insert")
+            j -= 1
+    steps.reverse()
+
+    # Merge runs of the same step into opcodes
+    opcodes = []
+    i = j = 0
+    for step in steps:
+        di = 0 if step == "insert" else 1
+        dj = 0 if step == "delete" else 1
+        if opcodes and opcodes[-1][0] == step:
+            tag, i1, _, j1, _ = opcodes[-1]
+            opcodes[-1] = (tag, i1, i + di, j1, j + dj)
+        else:
+            opcodes.append((step, i, i + di, j, j + dj))
+        i, j = i + di, j + dj
+    return opcodes
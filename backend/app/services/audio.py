@@ -1,15 +1,190 @@
 import asyncio
+import json
+import os
+import uuid
 from pathlib import Path
+from typing import Callable
 
 from app.config import settings
+from app.services.waveform import WaveformService
 
 
 class AudioService:
     """Service for audio processing utilities."""
 
+    # PCM format used when inputs must be decoded to be joined
+    CONCAT_SAMPLE_RATE = 24000
+    CONCAT_CHANNELS = 1
+
+    # Level below which recording edges count as silence
+    SILENCE_THRESHOLD = "-50dB"
+
+    # Normalizations in progress, by recording path
+    _normalizing: dict[str, asyncio.Task] = {}
+
     def __init__(self):
         settings.ensure_directories()
 
+    @staticmethod
+    def offsets_path(audio_path: str) -> Path:
+        """Sidecar file holding the offset table of a concatenated file."""
+        return Path(f"{audio_path}.offsets.json")
+
+    async def concatenate(self, input_paths: list[str], output_path: str) -> dict:
+        """Concatenate audio files into one and write a sidecar offset table.
+
+        Inputs that share container, codec parameters and the output's
+        extension are joined with the ffmpeg concat demuxer without
+        re-encoding. Anything else is decoded once and re-encoded in a single
+        pass. The offset table lists where each input starts and ends.
+        """
+        if not input_paths:
+            raise ValueError("No segments to combine")
+
+        probes = await asyncio.to_thread(
+            lambda: [self._probe(path) for path in input_paths]
+        )
+        formats = {probe["format"] for probe in probes}
+        suffixes = {Path(path).suffix.lower() for path in input_paths}
+
+        temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp{Path(output_path).suffix}"
+        try:
+            if (
+                None not in formats
+                and len(formats) == 1
+                and suffixes == {Path(output_path).suffix.lower()}
+            ):
+                await self._concat_copy(input_paths, temp_path)
+                durations = [probe["duration"] for probe in probes]
+            else:
+                durations = await self._concat_decode(input_paths, temp_path)
+            os.replace(temp_path, output_path)
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+        offsets = []
+        current_time = 0.0
+        for path, duration in zip(input_paths, durations):
+            offsets.append({
+                "path": path,
+                "start": current_time,
+                "end": current_time + duration,
+            })
+            current_time += duration
+
+        offsets_path = self.offsets_path(output_path)
+        await asyncio.to_thread(offsets_path.write_text, json.dumps(offsets))
+
+        return {
+            "path": output_path,
+            "duration": current_time,
+            "offsets": offsets,
+        }
+
+    @staticmethod
+    def _probe(path: str) -> dict:
+        """Read container/codec parameters and duration without decoding."""
+        try:
+            import mutagen
+
+            audio = mutagen.File(path)
+        except Exception:
+            audio = None
+
+        if audio is None or audio.info is None:
+            return {"format": None, "duration": 0.0}
+
+        info = audio.info
+        return {
+            "format": (
+                type(audio).__name__,
+                getattr(info, "sample_rate", None),
+                getattr(info, "channels", None),
+            ),
+            "duration": info.length,
+        }
+
+    async def _concat_copy(self, input_paths: list[str], output_path: str) -> None:
+        """Join inputs with the concat demuxer, copying the encoded stream."""
+        list_path = Path(f"{output_path}.txt")
+        lines = []
+        for path in input_paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            lines.append(f"file '{escaped}'\n")
+        await asyncio.to_thread(list_path.write_text, "".join(lines))
+
+        cmd = [
+            "ffmpeg",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(list_path),
+            "-c", "copy",
+            output_path,
+            "-y",
+        ]
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await process.communicate()
+        finally:
+            list_path.unlink(missing_ok=True)
+
+        if process.returncode != 0:
+            raise Exception(f"Failed to concatenate audio: {stderr.decode()}")
+
+    async def _concat_decode(
+        self, input_paths: list[str], output_path: str
+    ) -> list[float]:
+        """Decode each input to PCM and stream it into a single encoder.
+
+        Returns the decoded duration of each input.
+        """
+        pcm_args = [
+            "-f", "s16le",
+            "-ar", str(self.CONCAT_SAMPLE_RATE),
+            "-ac", str(self.CONCAT_CHANNELS),
+        ]
+        bytes_per_second = self.CONCAT_SAMPLE_RATE * self.CONCAT_CHANNELS * 2
+
+        encoder = await asyncio.create_subprocess_exec(
+            "ffmpeg", *pcm_args, "-i", "pipe:0", output_path, "-y",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Drain encoder stderr concurrently so it can never block on a full pipe
+        encoder_stderr = asyncio.create_task(encoder.stderr.read())
+
+        durations = []
+        try:
+            for path in input_paths:
+                decoder = await asyncio.create_subprocess_exec(
+                    "ffmpeg", "-i", path, *pcm_args, "pipe:1",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+                size = 0
+                while chunk := await decoder.stdout.read(64 * 1024):
+                    encoder.stdin.write(chunk)
+                    await encoder.stdin.drain()
+                    size += len(chunk)
+                if await decoder.wait() != 0:
+                    raise Exception(f"Failed to decode audio: {path}")
+                durations.append(size / bytes_per_second)
+        finally:
+            encoder.stdin.close()
+            await encoder.wait()
+            stderr = await encoder_stderr
+
+        if encoder.returncode != 0:
+            raise Exception(f"Failed to encode audio: {stderr.decode()}")
+
+        return durations
+
     async def extract_segment(
         self,
         source_path: str,
@@ -20,10 +195,11 @@ class AudioService:
         """Extract a segment from audio file."""
         duration = end_time - start_time
 
+        # -ss before -i seeks in the container instead of decoding up to it
         cmd = [
             "ffmpeg",
-            "-i", source_path,
             "-ss", str(start_time),
+            "-i", source_path,
             "-t", str(duration),
             "-c", "copy",
             output_path,
@@ -42,11 +218,88 @@ class AudioService:
 
         return output_path
 
-    async def convert_to_wav(self, source_path: str, output_path: str) -> str:
-        """Convert audio to WAV format for processing."""
+    @staticmethod
+    def clip_path(source_path: str, start_time: float, end_time: float) -> Path:
+        """Path of the clip cut from ``source_path`` between two times.
+
+        Clips are named after their source and range, so materials that
+        share an audio file also share its clips.
+        """
+        source = Path(source_path)
+        name = f"{source.stem}_{round(start_time * 1000)}_{round(end_time * 1000)}"
+        return settings.clips_dir / f"{name}{source.suffix}"
+
+    async def extract_clip(
+        self, source_path: str, start_time: float, end_time: float
+    ) -> str:
+        """Cut a segment clip, reusing it if it was already cut."""
+        clip_path = self.clip_path(source_path, start_time, end_time)
+        if clip_path.exists():
+            return str(clip_path)
+
+        # Cut to a temporary name so a partial clip is never served
+        temp_path = clip_path.with_name(
+            f"{clip_path.stem}.{uuid.uuid4().hex}.tmp{clip_path.suffix}"
+        )
+        try:
+            await self.extract_segment(
+                source_path, start_time, end_time, str(temp_path)
+            )
+            os.replace(temp_path, clip_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        return str(clip_path)
+
+    async def extract_clips(
+        self,
+        source_path: str,
+        ranges: list[tuple[float, float]],
+        on_progress: Callable[[float], None] | None = None,
+    ) -> list[str | None]:
+        """Cut clips for several (start, end) ranges of one source file.
+
+        Up to ``clip_concurrency`` ffmpeg processes run at once. Returns the
+        clip path per range, or None where cutting failed.
+        """
+        semaphore = asyncio.Semaphore(max(settings.clip_concurrency, 1))
+        done = 0
+
+        async def cut(start_time: float, end_time: float) -> str | None:
+            nonlocal done
+            try:
+                async with semaphore:
+                    return await self.extract_clip(source_path, start_time, end_time)
+            except Exception as e:
+                print(f"Clip Error ({source_path} {start_time}-{end_time}): {e}")
+                return None
+            finally:
+                done += 1
+                if on_progress:
+                    on_progress(done / len(ranges))
+
+        return await asyncio.gather(*(cut(start, end) for start, end in ranges))
+
+    async def convert_to_wav(
+        self, source_path: str, output_path: str, trim_silence: bool = False
+    ) -> str:
+        """Convert audio to WAV format for processing.
+
+        With ``trim_silence``, leading and trailing silence is removed.
+        """
+        filters = []
+        if trim_silence:
+            # Trim the start, then reverse to trim the end the same way
+            trim = (
+                f"silenceremove=start_periods=1:start_silence=0.1"
+                f":start_threshold={self.SILENCE_THRESHOLD}"
+            )
+            filters = ["-af", f"{trim},areverse,{trim},areverse"]
+
         cmd = [
             "ffmpeg",
             "-i", source_path,
+            *filters,
             "-ar", "16000",  # 16kHz sample rate
             "-ac", "1",     # Mono
             "-c:a", "pcm_s16le",
@@ -66,44 +319,58 @@ class AudioService:
 
         return output_path
 
-    async def get_waveform_data(
-        self, audio_path: str, samples: int = 1000
-    ) -> list[float]:
-        """Get waveform data for visualization."""
-        # This is a simplified version - for production use a proper audio library
-        cmd = [
-            "ffprobe",
-            "-f", "lavfi",
-            "-i", f"amovie={audio_path},astats=metadata=1:reset=1",
-            "-show_entries", "frame_tags=lavfi.astats.Overall.RMS_level",
-            "-of", "csv=p=0",
-        ]
+    @staticmethod
+    def normalized_path(recording_path: str) -> Path:
+        """16 kHz mono WAV sibling of a recording."""
+        return Path(f"{recording_path}.16k.wav")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+    async def normalize_recording(self, recording_path: str) -> str:
+        """Write the 16 kHz mono, silence-trimmed WAV used for transcription."""
+        output_path = self.normalized_path(recording_path)
+        temp_path = output_path.with_name(
+            f"{output_path.stem}.{uuid.uuid4().hex}.tmp.wav"
         )
-        stdout, _ = await process.communicate()
+        try:
+            await self.convert_to_wav(
+                recording_path, str(temp_path), trim_silence=True
+            )
+            os.replace(temp_path, output_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return str(output_path)
 
-        if process.returncode != 0:
-            # Return empty data on error
-            return [0.0] * samples
+    def start_normalize(self, recording_path: str) -> asyncio.Task:
+        """Normalize a recording in the background; evaluation waits for it."""
+        task = self._normalizing.get(recording_path)
+        if task is None:
+            task = asyncio.create_task(self._normalize_logged(recording_path))
+            self._normalizing[recording_path] = task
+            task.add_done_callback(
+                lambda _: self._normalizing.pop(recording_path, None)
+            )
+        return task
 
-        # Parse output
-        values = []
-        for line in stdout.decode().strip().split('\n'):
-            try:
-                values.append(float(line))
-            except ValueError:
-                continue
-
-        # Resample to desired number of samples
-        if len(values) == 0:
-            return [0.0] * samples
-
-        if len(values) >= samples:
-            step = len(values) / samples
-            return [values[int(i * step)] for i in range(samples)]
-        else:
-            return values + [0.0] * (samples - len(values))
+    async def _normalize_logged(self, recording_path: str) -> None:
+        try:
+            await self.normalize_recording(recording_path)
+        except Exception as e:
+            print(f"Recording normalize Error ({recording_path}): {e}")
+
+    async def transcription_source(self, recording_path: str) -> str:
+        """The normalized WAV of a recording, else the original.
+
+        Waits for a normalization still running in this process, since
+        evaluation usually starts right after the upload.
+        """
+        task = self._normalizing.get(recording_path)
+        if task is not None:
+            await asyncio.shield(task)
+        normalized = self.normalized_path(recording_path)
+        return str(normalized) if normalized.exists() else recording_path
+
+    async def get_waveform_data(
+        self, audio_path: str, samples: int = 1000
+    ) -> list[float]:
+        """Get waveform data for visualization (peak amplitude per sample)."""
+        peaks = await WaveformService().get_peaks(audio_path, points=samples)
+        return [max(-low, high) for low, high in zip(peaks["min"], peaks["max"])]
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.config import settings
+
+
+def hash_file(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SqliteCache:
+    """Size-bounded LRU cache of JSON values stored in SQLite.
+
+    Entries of all caches live in one table, partitioned by namespace, in
+    the SQLite file at ``settings.cache_db_path``. With ``ttl_seconds``
+    set, entries also expire that long after being stored. Hit/miss
+    counters are kept per process.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, ttl_seconds: float = 0):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            settings.ensure_directories()
+            conn = sqlite3.connect(
+                settings.cache_db_path, check_same_thread=False, timeout=10.0
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")
+            }
+            if "expires_at" not in columns:
+                # Cache files created before TTL support
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN expires_at REAL")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_lru "
+                "ON cache_entries (namespace, accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str):
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries "
+                "WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            if row[1] is not None and row[1] <= now:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? "
+                "WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value) -> None:
+        """Store a value and evict least recently used entries over budget."""
+        data = json.dumps(value)
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, size, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, data, len(data), now, expires_at),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = self._total_size(conn)
+        if total <= self.max_bytes:
+            return
+
+        if self.ttl_seconds > 0:
+            # Expired entries go first
+            self.expirations += conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            ).rowcount
+            total = self._total_size(conn)
+
+        # Trim to 90% of the budget so eviction doesn't run on every insert
+        target = self.max_bytes * 0.9
+        stale = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? "
+            "ORDER BY accessed_at",
+            (self.namespace,),
+        ):
+            if total <= target:
+                break
+            stale.append((self.namespace, key))
+            total -= size
+
+        conn.executemany(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", stale
+        )
+        self.evictions += len(stale)
+
+    def _total_size(self, conn: sqlite3.Connection) -> int:
+        return conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()[0]
+
+    async def aget(self, key: str):
+        """Async wrapper for get()."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value) -> None:
+        """Async wrapper for set()."""
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "max_bytes": self.max_bytes,
+        }
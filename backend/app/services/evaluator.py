@@ -1,13 +1,63 @@
-import httpx
+import hashlib
 import json
-from difflib import SequenceMatcher
+import time
+from typing import AsyncIterator
 
 from app.config import settings
+from app.services import alignment
+from app.services.cache import SqliteCache, make_key
+from app.services.llm import llm_client
+
+evaluation_cache = SqliteCache(
+    "evaluation",
+    max_bytes=settings.evaluation_cache_max_bytes,
+    ttl_seconds=settings.evaluation_cache_ttl_seconds,
+)
+
+
+class EvaluationTiers:
+    """Decides which evaluations need the LLM, and counts the decisions.
+
+    Accuracy at or above ``evaluation_local_above`` or below
+    ``evaluation_local_below`` is decisive on its own, so those get a
+    templated evaluation; only the band in between goes to the LLM.
+    """
+
+    def __init__(self):
+        self.counts = {"high": 0, "low": 0, "llm": 0}
+
+    def classify(self, accuracy: float) -> str:
+        """Return "high", "low" or "llm" for a local accuracy score."""
+        if accuracy >= settings.evaluation_local_above:
+            tier = "high"
+        elif accuracy < settings.evaluation_local_below:
+            tier = "low"
+        else:
+            tier = "llm"
+        self.counts[tier] += 1
+        return tier
+
+    def stats(self) -> dict:
+        """Decision counters for this process."""
+        total = sum(self.counts.values())
+        skipped = self.counts["high"] + self.counts["low"]
+        return {
+            **self.counts,
+            "llm_skipped": skipped,
+            "skip_rate": round(skipped / total, 4) if total else 0.0,
+            "local_above": settings.evaluation_local_above,
+            "local_below": settings.evaluation_local_below,
+        }
+
+
+evaluation_tiers = EvaluationTiers()
 
 
 class EvaluatorService:
     """Service for evaluating shadowing practice using LLM."""
 
+    CLAUDE_MODEL = "claude-3-haiku-20240307"
+
     EVALUATION_PROMPT = """You are an English pronunciation and shadowing practice evaluator.
 
 Compare the original text with the user's transcribed speech and provide feedback.
@@ -38,52 +88,213 @@ Respond ONLY with the JSON, no additional text."""
         self, original_text: str, transcribed_text: str
     ) -> dict:
         """Evaluate transcription against original text."""
-        # Calculate basic accuracy first
-        basic_accuracy = self._calculate_accuracy(original_text, transcribed_text)
+        started = time.perf_counter()
+        try:
+            return await self._evaluate(original_text, transcribed_text)
+        finally:
+            llm_client.record_latency("evaluation", time.perf_counter() - started)
+
+    async def _evaluate(self, original_text: str, transcribed_text: str) -> dict:
+        # Word-level scoring first
+        scores = alignment.score(original_text, transcribed_text)
+
+        provider = settings.llm_provider
+        if not self._llm_available():
+            # Fallback to basic evaluation
+            return self._basic_evaluation(scores)
+
+        tier = evaluation_tiers.classify(scores["accuracy"])
+        if tier != "llm":
+            return self._templated_evaluation(scores, tier)
+
+        key = self.cache_key(original_text, transcribed_text)
+        evaluation = await evaluation_cache.aget(key)
+        if evaluation is not None:
+            return self._with_scores(evaluation, scores)
+
+        try:
+            if provider == "ollama":
+                evaluation = await self._evaluate_with_ollama(
+                    original_text, transcribed_text
+                )
+            else:
+                evaluation = await self._evaluate_with_claude(
+                    original_text, transcribed_text
+                )
+        except Exception:
+            # Fallback results are not cached, so the LLM is retried next time
+            return self._basic_evaluation(scores)
+
+        await evaluation_cache.aset(key, evaluation)
+        return self._with_scores(evaluation, scores)
+
+    async def evaluate_stream(
+        self, original_text: str, transcribed_text: str
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Evaluate step by step, yielding (event, data) as results arrive.
+
+        Yields "accuracy" with the local word-level scores first, then
+        "token" chunks of LLM output when the provider streams (Ollama), and
+        finally "evaluation" with the parsed result.
+        """
+        started = time.perf_counter()
+        try:
+            scores = alignment.score(original_text, transcribed_text)
+            yield "accuracy", {
+                "accuracy_score": scores["accuracy"],
+                "wer": scores["wer"],
+                "cer": scores["cer"],
+            }
+
+            if not self._llm_available():
+                yield "evaluation", self._basic_evaluation(scores)
+                return
+
+            tier = evaluation_tiers.classify(scores["accuracy"])
+            if tier != "llm":
+                yield "evaluation", self._templated_evaluation(scores, tier)
+                return
+
+            key = self.cache_key(original_text, transcribed_text)
+            evaluation = await evaluation_cache.aget(key)
+            if evaluation is not None:
+                yield "evaluation", self._with_scores(evaluation, scores)
+                return
+
+            try:
+                if settings.llm_provider == "ollama":
+                    parts = []
+                    async for token in self._stream_with_ollama(
+                        original_text, transcribed_text
+                    ):
+                        parts.append(token)
+                        yield "token", {"text": token}
+                    evaluation = json.loads("".join(parts))
+                else:
+                    evaluation = await self._evaluate_with_claude(
+                        original_text, transcribed_text
+                    )
+            except Exception:
+                yield "evaluation", self._basic_evaluation(scores)
+                return
 
+            await evaluation_cache.aset(key, evaluation)
+            yield "evaluation", self._with_scores(evaluation, scores)
+
+        finally:
+            llm_client.record_latency("evaluation", time.perf_counter() - started)
+
+    @staticmethod
+    def _llm_available() -> bool:
+        """Whether the configured provider can be called."""
         if settings.llm_provider == "ollama":
-            return await self._evaluate_with_ollama(
-                original_text, transcribed_text, basic_accuracy
-            )
-        elif settings.llm_provider == "claude":
-            return await self._evaluate_with_claude(
-                original_text, transcribed_text, basic_accuracy
-            )
+            return True
+        return settings.llm_provider == "claude" and bool(settings.claude_api_key)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalized words joined by single spaces."""
+        return " ".join(alignment.tokenize(text))
+
+    def cache_key(self, original_text: str, transcribed_text: str) -> str:
+        """Evaluation cache key for the current provider, model and prompt."""
+        model = (
+            settings.ollama_model
+            if settings.llm_provider == "ollama"
+            else self.CLAUDE_MODEL
+        )
+        return make_key(
+            self.normalize(original_text),
+            self.normalize(transcribed_text),
+            settings.llm_provider,
+            model,
+            hashlib.sha256(self.EVALUATION_PROMPT.encode()).hexdigest(),
+        )
+
+    @staticmethod
+    def _word_differences(scores: dict) -> tuple[list[str], list[str]]:
+        """Missing and added words from the alignment, in spoken order."""
+        words = scores["words"]
+        missing = [
+            word["reference"]
+            for word in words
+            if word["op"] in ("deletion", "substitution")
+        ]
+        added = [
+            word["hypothesis"]
+            for word in words
+            if word["op"] in ("insertion", "substitution")
+        ]
+        return missing, added
+
+    def _templated_evaluation(self, scores: dict, tier: str) -> dict:
+        """Deterministic evaluation for decisive (high or low) accuracy."""
+        missing, added = self._word_differences(scores)
+        accuracy = scores["accuracy"]
+
+        if tier == "high":
+            evaluation = {
+                "pronunciation_notes": (
+                    "Your speech was recognized almost exactly as the original."
+                ),
+                "overall_feedback": (
+                    f"Excellent! Accuracy: {accuracy}%. Try a faster playback "
+                    "speed or a longer segment to keep challenging yourself."
+                ),
+                "strengths": ["Accurate wording", "Clear pronunciation"],
+                "areas_to_improve": missing[:3],
+            }
         else:
-            # Fallback to basic evaluation
-            return self._basic_evaluation(
-                original_text, transcribed_text, basic_accuracy
-            )
-
-    def _calculate_accuracy(self, original: str, transcribed: str) -> float:
-        """Calculate basic text similarity."""
-        original_lower = original.lower().strip()
-        transcribed_lower = transcribed.lower().strip()
-        ratio = SequenceMatcher(None, original_lower, transcribed_lower).ratio()
-        return round(ratio * 100, 1)
-
-    def _basic_evaluation(
-        self, original: str, transcribed: str, accuracy: float
-    ) -> dict:
-        """Basic evaluation without LLM."""
-        original_words = set(original.lower().split())
-        transcribed_words = set(transcribed.lower().split())
+            evaluation = {
+                "pronunciation_notes": (
+                    "Most of the original could not be recognized in the recording."
+                ),
+                "overall_feedback": (
+                    f"Accuracy: {accuracy}%. Listen to the segment again at a "
+                    "slower speed and shadow a few words at a time."
+                ),
+                "strengths": [],
+                "areas_to_improve": [
+                    "Listen at a slower playback speed",
+                    "Shadow shorter phrases first",
+                    "Speak closer to the microphone",
+                ],
+            }
+
+        return self._with_scores({
+            "accuracy_score": accuracy,
+            "missing_words": missing[:5],
+            "added_words": added[:5],
+            **evaluation,
+        }, scores)
 
-        missing = list(original_words - transcribed_words)
-        added = list(transcribed_words - original_words)
+    def _basic_evaluation(self, scores: dict) -> dict:
+        """Basic evaluation without LLM, from the word alignment."""
+        missing, added = self._word_differences(scores)
+        accuracy = scores["accuracy"]
 
-        return {
+        return self._with_scores({
             "accuracy_score": accuracy,
             "missing_words": missing[:5],  # Limit to 5
             "added_words": added[:5],
             "pronunciation_notes": "LLM evaluation not available",
             "overall_feedback": f"Accuracy: {accuracy}%. Keep practicing!",
             "strengths": [],
-            "areas_to_improve": missing[:3] if missing else [],
+            "areas_to_improve": missing[:3],
+        }, scores)
+
+    @staticmethod
+    def _with_scores(evaluation: dict, scores: dict) -> dict:
+        """Add WER/CER and the per-word alignment to an evaluation."""
+        return {
+            **evaluation,
+            "wer": scores["wer"],
+            "cer": scores["cer"],
+            "word_alignment": scores["words"],
         }
 
     async def _evaluate_with_ollama(
-        self, original: str, transcribed: str, basic_accuracy: float
+        self, original: str, transcribed: str
     ) -> dict:
         """Evaluate using Ollama."""
         prompt = self.EVALUATION_PROMPT.format(
@@ -91,62 +302,80 @@ Respond ONLY with the JSON, no additional text."""
             transcribed_text=transcribed,
         )
 
-        try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{settings.ollama_base_url}/api/generate",
-                    json={
-                        "model": settings.ollama_model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "format": "json",
-                    },
-                )
-                response.raise_for_status()
+        response = await llm_client.post(
+            "ollama",
+            f"{settings.ollama_base_url}/api/generate",
+            json={
+                "model": settings.ollama_model,
+                "prompt": prompt,
+                "stream": False,
+                "format": "json",
+            },
+        )
+        response.raise_for_status()
 
-                result = response.json()
-                evaluation = json.loads(result["response"])
-                return evaluation
+        result = response.json()
+        evaluation = json.loads(result["response"])
+        return evaluation
 
-        except Exception as e:
-            # Fallback to basic evaluation
-            return self._basic_evaluation(original, transcribed, basic_accuracy)
+    async def _stream_with_ollama(
+        self, original: str, transcribed: str
+    ) -> AsyncIterator[str]:
+        """Evaluate using Ollama, yielding response text as it is generated."""
+        prompt = self.EVALUATION_PROMPT.format(
+            original_text=original,
+            transcribed_text=transcribed,
+        )
+
+        async with llm_client.stream(
+            "ollama",
+            f"{settings.ollama_base_url}/api/generate",
+            json={
+                "model": settings.ollama_model,
+                "prompt": prompt,
+                "stream": True,
+                "format": "json",
+            },
+        ) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
 
     async def _evaluate_with_claude(
-        self, original: str, transcribed: str, basic_accuracy: float
+        self, original: str, transcribed: str
     ) -> dict:
         """Evaluate using Claude API."""
-        if not settings.claude_api_key:
-            return self._basic_evaluation(original, transcribed, basic_accuracy)
-
         prompt = self.EVALUATION_PROMPT.format(
             original_text=original,
             transcribed_text=transcribed,
         )
 
-        try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers={
-                        "x-api-key": settings.claude_api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json",
-                    },
-                    json={
-                        "model": "claude-3-haiku-20240307",
-                        "max_tokens": 1024,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                    },
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                content = result["content"][0]["text"]
-                evaluation = json.loads(content)
-                return evaluation
+        response = await llm_client.post(
+            "claude",
+            f"{settings.claude_base_url}/v1/messages",
+            headers={
+                "x-api-key": settings.claude_api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": self.CLAUDE_MODEL,
+                "max_tokens": 1024,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+            },
+        )
+        response.raise_for_status()
 
-        except Exception as e:
-            return self._basic_evaluation(original, transcribed, basic_accuracy)
+        result = response.json()
+        content = result["content"][0]["text"]
+        evaluation = json.loads(content)
+        return evaluation
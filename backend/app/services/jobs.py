@@ -0,0 +1,373 @@
+import asyncio
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models import Job
+
+
+class JobContext:
+    """State handed to a job stage while it runs."""
+
+    # Minimum seconds between persisted progress updates
+    REPORT_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        runner: "JobRunner",
+        job_id: int,
+        payload: dict,
+        state: dict,
+        progress_start: float,
+        progress_span: float,
+    ):
+        self.runner = runner
+        self.job_id = job_id
+        self.payload = payload
+        self.state = state
+        self._progress_start = progress_start
+        self._progress_span = progress_span
+        self._last_report = 0.0
+
+    def report(self, fraction: float) -> None:
+        """Report progress within the current stage (0.0 - 1.0).
+
+        Safe to call from executor threads; updates are throttled.
+        """
+        now = time.monotonic()
+        if now - self._last_report < self.REPORT_INTERVAL:
+            return
+        self._last_report = now
+
+        fraction = min(max(fraction, 0.0), 1.0)
+        progress = self._progress_start + self._progress_span * fraction
+        self.runner.report_progress(self.job_id, progress)
+
+
+StageFunc = Callable[[JobContext, AsyncSession], Awaitable[dict]]
+
+
+class JobRunner:
+    """Bounded worker pool that runs persisted jobs stage by stage.
+
+    Each job kind is registered as an ordered list of stages. The output of
+    every finished stage is stored in ``Job.state`` in the same transaction
+    that marks it done, so an interrupted job resumes from the first stage
+    that has no output yet. Outputs registered as transient (e.g. a full
+    transcript that a later stage saved elsewhere) are dropped once the
+    job has finished.
+
+    Several processes may share the database. A runner claims a job with a
+    conditional update before running it and keeps its heartbeat fresh
+    while it runs; a running job is only taken over by another runner once
+    its heartbeat is older than ``job_stale_seconds``.
+    """
+
+    def __init__(self):
+        self._pipelines: dict[str, list[tuple[str, float, StageFunc]]] = {}
+        self._transient: dict[str, set[str]] = {}
+        self._queue: asyncio.Queue[int] | None = None
+        self._queued: set[int] = set()
+        self._workers: list[asyncio.Task] = []
+        self._heartbeat_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Unique per process and start, so a restarted worker is a new owner
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def register(
+        self,
+        kind: str,
+        stages: list[tuple[str, float, StageFunc]],
+        transient: tuple[str, ...] = (),
+    ) -> None:
+        """Register a pipeline as a list of (name, weight, stage) tuples.
+
+        Outputs of the ``transient`` stages are not kept after the job ends.
+        """
+        self._pipelines[kind] = stages
+        self._transient[kind] = set(transient)
+
+    async def start(self, workers: int) -> None:
+        """Start worker tasks and queue pending and abandoned jobs."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(max(workers, 1))
+        ]
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        await self._requeue(include_pending=True)
+
+    async def stop(self) -> None:
+        """Cancel worker tasks and release their jobs to resume elsewhere."""
+        tasks = self._workers + ([self._heartbeat_task] if self._heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat_task = None
+        self._queue = None
+        self._queued.clear()
+
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.owner == self.owner, Job.status == "running")
+                .values(status="pending", owner=None, heartbeat=None)
+            )
+            await db.commit()
+
+    async def create_job(self, db: AsyncSession, kind: str, payload: dict) -> Job:
+        """Persist a new job and queue it for execution."""
+        if kind not in self._pipelines:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(kind=kind, payload=payload, state={})
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+
+        self.submit(job.id)
+        return job
+
+    async def find_active(self, db: AsyncSession, kind: str, **match) -> Job | None:
+        """Find a pending or running job whose payload contains ``match``."""
+        result = await db.execute(
+            select(Job)
+            .where(Job.kind == kind, Job.status.in_(["pending", "running"]))
+            .order_by(Job.id)
+        )
+        for job in result.scalars().all():
+            payload = job.payload or {}
+            if all(payload.get(key) == value for key, value in match.items()):
+                return job
+        return None
+
+    async def record_completed(
+        self, db: AsyncSession, kind: str, payload: dict, output: dict
+    ) -> Job:
+        """Persist a job that was satisfied without running its pipeline.
+
+        Commits the session, so work the caller flushed is saved with it.
+        """
+        job = Job(
+            kind=kind,
+            status="completed",
+            progress=1.0,
+            payload=payload,
+            state={"reuse": output},
+            material_id=output.get("material_id"),
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    def submit(self, job_id: int) -> None:
+        """Queue a job. Jobs submitted before start() are picked up on start."""
+        if self._queue is not None and job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    def report_progress(self, job_id: int, progress: float) -> None:
+        """Persist job progress; callable from any thread."""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(
+            lambda: asyncio.ensure_future(self._set_progress(job_id, progress))
+        )
+
+    async def _set_progress(self, job_id: int, progress: float) -> None:
+        # Writes are not awaited by the reporter and may land after a later
+        # stage's commit; only ever move progress forward
+        progress = round(progress, 4)
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(
+                    Job.id == job_id,
+                    Job.status == "running",
+                    Job.progress < progress,
+                )
+                .values(progress=progress)
+            )
+            await db.commit()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                print(f"Job {job_id} Error: {traceback.format_exc()}")
+            finally:
+                self._queued.discard(job_id)
+                self._queue.task_done()
+
+    async def _heartbeat(self) -> None:
+        """Keep claimed jobs alive and pick up jobs whose runner died."""
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_interval)
+            try:
+                async with async_session() as db:
+                    await db.execute(
+                        update(Job)
+                        .where(Job.owner == self.owner, Job.status == "running")
+                        .values(heartbeat=datetime.utcnow())
+                    )
+                    await db.commit()
+                await self._requeue(include_pending=False)
+            except Exception as e:
+                print(f"Job heartbeat Error: {e}")
+
+    async def _requeue(self, include_pending: bool) -> None:
+        """Queue jobs this runner could claim.
+
+        Pending jobs are normally queued by the runner that created them;
+        on start all are included, later only those waiting longer than
+        ``job_stale_seconds`` (their runner stopped before claiming them).
+        """
+        stale = datetime.utcnow() - timedelta(seconds=settings.job_stale_seconds)
+        pending = Job.status == "pending"
+        if not include_pending:
+            pending = and_(pending, Job.created_at < stale)
+        async with async_session() as db:
+            result = await db.execute(
+                select(Job.id)
+                .where(or_(pending, self._abandoned(stale)))
+                .order_by(Job.id)
+            )
+            for job_id in result.scalars().all():
+                self.submit(job_id)
+
+    @staticmethod
+    def _abandoned(stale: datetime):
+        """Running jobs whose runner has stopped sending heartbeats."""
+        return and_(
+            Job.status == "running",
+            or_(Job.heartbeat.is_(None), Job.heartbeat < stale),
+        )
+
+    async def _claim(self, job_id: int) -> bool:
+        """Atomically take a pending or abandoned job. False if another runner has it."""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.job_stale_seconds)
+        async with async_session() as db:
+            result = await db.execute(
+                update(Job)
+                .where(
+                    Job.id == job_id,
+                    or_(Job.status == "pending", self._abandoned(stale)),
+                )
+                .values(status="running", owner=self.owner, heartbeat=now)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def _run(self, job_id: int) -> None:
+        async with async_session() as db:
+            job = await db.get(Job, job_id)
+            if job is None or job.status in ("completed", "failed"):
+                return
+
+            kind = job.kind
+            stages = self._pipelines.get(kind)
+            if stages is None:
+                job.status = "failed"
+                job.error = f"Unknown job kind: {job.kind}"
+                await db.commit()
+                return
+
+        if not await self._claim(job_id):
+            return
+
+        async with async_session() as db:
+            job = await db.get(Job, job_id)
+            payload = dict(job.payload or {})
+            state = dict(job.state or {})
+
+        total_weight = sum(weight for _, weight, _ in stages) or 1.0
+        done_weight = sum(weight for name, weight, _ in stages if name in state)
+
+        for name, weight, stage in stages:
+            if name in state:
+                continue
+
+            progress_start = done_weight / total_weight
+            await self._mark_stage(job_id, name, progress_start)
+            ctx = JobContext(
+                self, job_id, payload, state, progress_start, weight / total_weight
+            )
+
+            try:
+                async with async_session() as db:
+                    output = await stage(ctx, db)
+
+                    # Record the stage output atomically with its side effects
+                    state = {**state, name: output}
+                    done_weight += weight
+                    job = await db.get(Job, job_id)
+                    if job is None or job.owner != self.owner:
+                        # Taken over after a missed heartbeat; discard the work
+                        await db.rollback()
+                        print(f"Job {job_id} was claimed by another runner")
+                        return
+                    job.state = state
+                    job.progress = round(done_weight / total_weight, 4)
+                    if "material_id" in output:
+                        job.material_id = output["material_id"]
+                    await db.commit()
+
+            except Exception as e:
+                print(f"Job {job_id} stage '{name}' Error: {traceback.format_exc()}")
+                await self._mark_failed(
+                    job_id, f"{type(e).__name__}: {str(e)}", self._prune(kind, state)
+                )
+                return
+
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.owner == self.owner)
+                .values(
+                    status="completed",
+                    stage=None,
+                    progress=1.0,
+                    state=self._prune(kind, state),
+                )
+            )
+            await db.commit()
+
+    async def _mark_stage(self, job_id: int, stage: str, progress: float) -> None:
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.owner == self.owner)
+                .values(stage=stage, progress=round(progress, 4))
+            )
+            await db.commit()
+
+    async def _mark_failed(self, job_id: int, error: str, state: dict) -> None:
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.owner == self.owner)
+                .values(status="failed", error=error, state=state)
+            )
+            await db.commit()
+
+    def _prune(self, kind: str, state: dict) -> dict:
+        """Stage outputs worth keeping on a finished job."""
+        transient = self._transient.get(kind, set())
+        return {name: output for name, output in state.items() if name not in transient}
+
+
+job_runner = JobRunner()
@@ -0,0 +1,147 @@
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from app.config import settings
+
+
+class LlmClient:
+    """Application-scoped HTTP client shared by all LLM calls.
+
+    One pooled ``httpx.AsyncClient`` keeps connections to the LLM providers
+    alive between evaluations. It is opened and closed by the app lifespan;
+    used outside of it (scripts), it is created on first request.
+    """
+
+    # Latency samples kept per provider for percentiles
+    LATENCY_WINDOW = 1000
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._latencies: dict[str, deque[float]] = {}
+
+    async def start(self) -> None:
+        """Open the connection pool."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry,
+                ),
+            )
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def timeout(provider: str) -> httpx.Timeout:
+        """Request timeout for a provider."""
+        read_timeout = {
+            "ollama": settings.ollama_timeout,
+            "claude": settings.claude_timeout,
+        }.get(provider, 60.0)
+        return httpx.Timeout(read_timeout, connect=settings.llm_connect_timeout)
+
+    async def post(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        """POST to a provider through the shared pool and record its latency."""
+        await self.start()
+
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            return await self._client.post(
+                url,
+                timeout=self.timeout(provider),
+                extensions={"trace": self._trace},
+                **kwargs,
+            )
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.record_latency(provider, time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def stream(
+        self, provider: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """POST and stream the response body; latency covers the whole body."""
+        await self.start()
+
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            async with self._client.stream(
+                "POST",
+                url,
+                timeout=self.timeout(provider),
+                extensions={"trace": self._trace},
+                **kwargs,
+            ) as response:
+                yield response
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.record_latency(provider, time.perf_counter() - started)
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        # Only fires when the pool has no idle connection to reuse
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def record_latency(self, name: str, seconds: float) -> None:
+        """Add a latency sample under ``name``."""
+        samples = self._latencies.setdefault(
+            name, deque(maxlen=self.LATENCY_WINDOW)
+        )
+        samples.append(seconds)
+
+    def stats(self) -> dict:
+        """Pool usage and latency percentiles (ms) for this process."""
+        latency = {}
+        for name, samples in self._latencies.items():
+            ordered = sorted(samples)
+            latency[name] = {
+                "count": len(ordered),
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_rate": (
+                round(1 - self.connections_opened / self.requests, 4)
+                if self.requests
+                else 0.0
+            ),
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_connections": settings.llm_max_connections,
+            "latency": latency,
+        }
+
+
+llm_client = LlmClient()
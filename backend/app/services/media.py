@@ -0,0 +1,212 @@
+import asyncio
+import mimetypes
+import os
+import re
+import stat
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.services.cache import hash_file
+from app.services.tts import tts_cache
+
+# Media types for audio files served by the API
+AUDIO_MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".wav": "audio/wav",
+    ".webm": "audio/webm",
+    ".ogg": "audio/ogg",
+}
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class _EtagCache:
+    """In-memory map of (path, size, mtime) to content-hash ETags.
+
+    Hashing a file is done once per version of it; entries for changed
+    files simply stop matching and age out.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+
+    async def get(self, path: Path, stat_result: os.stat_result) -> str:
+        key = (str(path), stat_result.st_size, stat_result.st_mtime_ns)
+        etag = self._entries.get(key)
+        if etag is None:
+            digest = await asyncio.to_thread(hash_file, path)
+            etag = f'"{digest}"'
+            self._entries[key] = etag
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return etag
+
+
+etag_cache = _EtagCache()
+
+
+def is_content_addressed(path: Path) -> bool:
+    """Whether the file name is a hash of its content (never changes)."""
+    return path.parent.resolve() == tts_cache.directory.resolve()
+
+
+def audio_media_type(path: Path) -> str:
+    """Media type for an audio file, by extension."""
+    return AUDIO_MEDIA_TYPES.get(path.suffix.lower(), "audio/mpeg")
+
+
+async def media_response(
+    request: Request,
+    path: Path,
+    media_type: str | None = None,
+    stat_result: os.stat_result | None = None,
+) -> Response:
+    """Serve a file with validators, caching headers and Range support.
+
+    - Strong ETag from the content hash (the file name for content-addressed
+      files); ``If-None-Match`` answers 304 without a body.
+    - ``Cache-Control: immutable`` for content-addressed files, revalidation
+      for everything else.
+    - A single ``bytes=`` range answers 206 with just that slice; ranges
+      past the end answer 416.
+    """
+    path = Path(path)
+    if stat_result is None:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    if media_type is None:
+        media_type = (
+            AUDIO_MEDIA_TYPES.get(path.suffix.lower())
+            or mimetypes.guess_type(path.name)[0]
+            or "application/octet-stream"
+        )
+
+    if is_content_addressed(path):
+        etag = f'"{path.stem}"'
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        etag = await etag_cache.get(path, stat_result)
+        cache_control = "no-cache"
+
+    size = stat_result.st_size
+    headers = {
+        "etag": etag,
+        "cache-control": cache_control,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "accept-ranges": "bytes",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range == "unsatisfiable":
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    if not isinstance(byte_range, tuple):
+        if request.method == "HEAD":
+            return Response(
+                media_type=media_type,
+                headers={**headers, "content-length": str(size)},
+            )
+        return FileResponse(
+            path, media_type=media_type, headers=headers, stat_result=stat_result
+        )
+
+    start, end = byte_range
+    headers.update({
+        "content-range": f"bytes {start}-{end}/{size}",
+        "content-length": str(end - start + 1),
+    })
+    if request.method == "HEAD":
+        return Response(status_code=206, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        _read_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return etag in candidates
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | str | None:
+    """Parse a single-range ``Range`` header into inclusive byte offsets.
+
+    Returns None for headers that are ignored (malformed or multi-range, so
+    the whole file is sent) and "unsatisfiable" for ranges past the end.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+async def _read_range(path: Path, start: int, end: int):
+    """Yield bytes start..end (inclusive), reading in a worker thread."""
+    with open(path, "rb") as f:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class MediaStaticFiles(StaticFiles):
+    """StaticFiles that serves regular files through media_response()."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            try:
+                full_path, stat_result = await asyncio.to_thread(
+                    self.lookup_path, path
+                )
+            except (OSError, ValueError):
+                stat_result = None
+
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                return await media_response(
+                    Request(scope), Path(full_path), stat_result=stat_result
+                )
+
+        return await super().get_response(path, scope)
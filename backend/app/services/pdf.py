@@ -1,111 +1,200 @@
+import asyncio
 import re
+import uuid
+from contextlib import aclosing
 from pathlib import Path
-from datetime import datetime
+from typing import AsyncIterator
 from fastapi import UploadFile
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models import Material, Segment
+from app.services.response_cache import response_cache
+from app.services.segments import insert_segments
+from app.services.tts import TtsService
+from app.services.uploads import spool_upload
 
 
-class PdfService:
-    """Service for extracting text from PDF files."""
+class SentenceSplitter:
+    """Incremental sentence splitter.
 
-    def __init__(self):
-        settings.ensure_directories()
+    Text is fed page by page; complete sentences are returned as soon as a
+    sentence ending is seen and the unfinished tail is kept for the next
+    page.
+    """
 
-    async def extract_text(self, file: UploadFile) -> list[dict]:
-        """Extract text from PDF and split into segments."""
-        import fitz  # PyMuPDF
+    BOUNDARY = re.compile(r'(?<=[.!?])\s+')
 
-        # Save uploaded file temporarily
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        temp_path = settings.materials_dir / f"temp_{timestamp}.pdf"
+    def __init__(self):
+        self._buffer = ""
 
-        content = await file.read()
-        with open(temp_path, "wb") as f:
-            f.write(content)
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the sentences completed by it."""
+        self._buffer = re.sub(r'\s+', ' ', self._buffer + text)
 
-        try:
-            # Extract text from PDF
-            doc = fitz.open(temp_path)
-            full_text = ""
+        parts = self.BOUNDARY.split(self._buffer)
+        self._buffer = parts.pop()
+        return self._filter(parts)
 
-            for page in doc:
-                full_text += page.get_text()
+    def flush(self) -> list[str]:
+        """Return whatever is left as the final sentence."""
+        parts, self._buffer = [self._buffer], ""
+        return self._filter(parts)
 
-            doc.close()
+    @staticmethod
+    def _filter(sentences: list[str]) -> list[str]:
+        result = []
+        for sentence in sentences:
+            sentence = sentence.strip()
+            # Skip very short segments and segments that look like headers/page numbers
+            if sentence and len(sentence) > 10 and not sentence.isdigit():
+                result.append(sentence)
+        return result
 
-            # Split into sentences
-            segments = self._split_into_sentences(full_text)
 
-            return segments
+class PdfService:
+    """Service for extracting text from PDF files."""
 
-        finally:
-            # Clean up temp file
-            temp_path.unlink(missing_ok=True)
+    def __init__(self):
+        settings.ensure_directories()
 
-    def _split_into_sentences(self, text: str, max_segments: int = 10) -> list[dict]:
-        """Split text into sentences.
+    async def spool(self, file: UploadFile) -> Path:
+        """Write the uploaded PDF to a temporary file in chunks.
 
-        Args:
-            text: Full text to split
-            max_segments: Maximum number of segments to return (default 50)
+        Raises UploadTooLargeError past ``max_pdf_upload_bytes``.
         """
-        # Clean up text
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
+        temp_path = settings.materials_dir / f"temp_{uuid.uuid4().hex}.pdf"
+        await spool_upload(file, temp_path, max_bytes=settings.max_pdf_upload_bytes)
+        return temp_path
 
-        # Split by sentence endings
-        sentence_pattern = r'(?<=[.!?])\s+'
-        sentences = re.split(sentence_pattern, text)
+    async def iter_sentences(self, pdf_path: Path) -> AsyncIterator[str]:
+        """Yield sentences page by page; extraction runs in a worker thread."""
+        import fitz  # PyMuPDF
 
-        # Filter out empty sentences and create segments
-        segments = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            # Skip very short segments and segments that look like headers/page numbers
-            if sentence and len(sentence) > 10 and not sentence.isdigit():
-                segments.append({
-                    "text": sentence,
-                })
-                # Limit number of segments for performance
-                if len(segments) >= max_segments:
-                    break
+        doc = await asyncio.to_thread(fitz.open, pdf_path)
+        splitter = SentenceSplitter()
+        try:
+            for page_number in range(doc.page_count):
+                text = await asyncio.to_thread(self._page_text, doc, page_number)
+                for sentence in splitter.feed(text):
+                    yield sentence
 
-        return segments
+            for sentence in splitter.flush():
+                yield sentence
 
-    async def save_material(
+        finally:
+            doc.close()
+
+    @staticmethod
+    def _page_text(doc, page_number: int) -> str:
+        return doc[page_number].get_text()
+
+    async def import_document(
         self,
         db: AsyncSession,
+        pdf_path: Path,
         title: str,
-        audio_path: str,
-        duration: float,
-        segments: list[dict],
-    ) -> Material:
-        """Save material and segments to database."""
+        tts_service: TtsService,
+    ) -> tuple[Material, int]:
+        """Import a PDF as a material, generating TTS audio as it goes.
+
+        Sentences are synthesized and saved in batches of
+        ``pdf_segment_batch_size`` while the document is still being read,
+        so memory stays bounded however long the document is. The material
+        stays hidden from listings (status "importing") until its audio is
+        combined; a failed import removes it.
+
+        Returns the material and its segment count.
+        """
         material = Material(
             title=title,
             source_type="pdf",
             source_url=None,
-            audio_path=audio_path,
-            duration=duration,
+            audio_path="",
+            duration=0.0,
+            status="importing",
         )
         db.add(material)
-        await db.flush()
-
-        for i, seg in enumerate(segments):
-            segment = Segment(
-                material_id=material.id,
-                text=seg["text"],
-                start_time=seg.get("start", 0.0),
-                end_time=seg.get("end", 0.0),
-                audio_path=seg.get("audio_path"),
-                order=i,
+        await db.commit()
+
+        segment_count = 0
+        current_time = 0.0
+
+        async def save_batch(sentences: list[str]) -> None:
+            nonlocal segment_count, current_time
+            audio_segments = await tts_service.generate_audio_segments(
+                [{"text": sentence} for sentence in sentences],
+                start_time=current_time,
             )
-            db.add(segment)
+            await self.save_segments(db, material.id, audio_segments, segment_count)
+
+            if not material.audio_path:
+                # First segment's audio until the combined file is ready
+                material.audio_path = audio_segments[0]["audio_path"]
+            segment_count += len(audio_segments)
+            current_time = audio_segments[-1]["end"]
+            material.duration = current_time
+            await db.commit()
+
+        try:
+            batch = []
+            async with aclosing(self.iter_sentences(pdf_path)) as sentences:
+                async for sentence in sentences:
+                    batch.append(sentence)
+                    if len(batch) >= settings.pdf_segment_batch_size:
+                        await save_batch(batch)
+                        batch = []
+            if batch:
+                await save_batch(batch)
+
+            if segment_count:
+                await self._combine_audio(db, material, tts_service)
+
+            material.status = "ready"
+            await response_cache.bump(db, material.id)
+            await db.commit()
+
+        except Exception:
+            await db.rollback()
+            await db.delete(material)
+            await db.commit()
+            raise
 
-        await db.commit()
         await db.refresh(material)
+        return material, segment_count
+
+    async def _combine_audio(
+        self, db: AsyncSession, material: Material, tts_service: TtsService
+    ) -> None:
+        """Give the material one continuous audio file of all its segments.
+
+        Keeps the first segment's audio if combining fails.
+        """
+        result = await db.execute(
+            select(Segment.audio_path)
+            .where(Segment.material_id == material.id)
+            .order_by(Segment.order)
+        )
+        segments = [{"audio_path": path} for path in result.scalars().all()]
+        output_path = str(settings.materials_dir / f"pdf_{material.id}.mp3")
+
+        try:
+            combined = await tts_service.combine_segments(segments, output_path)
+        except Exception as e:
+            print(f"PDF audio combine failed, using first segment audio: {e}")
+            return
+
+        material.audio_path = combined["path"]
+        material.duration = combined["duration"]
+        await db.commit()
 
-        return material
+    async def save_segments(
+        self,
+        db: AsyncSession,
+        material_id: int,
+        segments: list[dict],
+        start_order: int = 0,
+    ) -> None:
+        """Add segments to a material. The caller commits."""
+        await insert_segments(db, material_id, segments, start_order)
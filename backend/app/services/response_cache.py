@@ -0,0 +1,149 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+# Version scope of everything in the material list
+LIBRARY = 0
+
+
+class ResponseCache:
+    """Serialized JSON responses of material read endpoints.
+
+    Every material has a version counter in the ``material_versions``
+    table, bumped by whatever changes the material, its segments or its
+    practice count; the ``LIBRARY`` row is bumped along with each of them.
+    A response is cached per request key together with the version it was
+    built from, so checking freshness costs one primary-key lookup. The
+    version also gives the ETag, which alone decides 304s; the update time
+    is only sent as Last-Modified, since several bumps can fall within
+    one second of HTTP date resolution. Counters live in the database so
+    they survive restarts and are shared by every worker.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def version(
+        self, db: AsyncSession, scope: int
+    ) -> tuple[int, datetime | None]:
+        """Current version and update time of a material (or ``LIBRARY``)."""
+        row = (
+            await db.execute(
+                text(
+                    "SELECT version, updated_at FROM material_versions "
+                    "WHERE material_id = :scope"
+                ),
+                {"scope": scope},
+            )
+        ).first()
+        if row is None:
+            return 0, None
+        updated_at = row.updated_at
+        if isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+        return row.version, updated_at
+
+    async def bump(self, db: AsyncSession, material_id: int) -> None:
+        """Mark a material (and the library) as changed. The caller commits."""
+        # Bound as text; sqlite3's implicit datetime adapter is deprecated
+        now = datetime.utcnow().isoformat(sep=" ")
+        for scope in (material_id, LIBRARY):
+            await db.execute(
+                text(
+                    "INSERT INTO material_versions (material_id, version, updated_at) "
+                    "VALUES (:scope, 1, :now) "
+                    "ON CONFLICT (material_id) DO UPDATE "
+                    "SET version = version + 1, updated_at = :now"
+                ),
+                {"scope": scope, "now": now},
+            )
+
+    async def respond(
+        self,
+        request: Request,
+        db: AsyncSession,
+        scope: int,
+        build: Callable[[], Awaitable[bytes]],
+    ) -> Response:
+        """Serve a JSON body for ``scope``, from cache or by calling ``build``.
+
+        Answers 304 when the client's ETag is still current.
+        """
+        version, updated_at = await self.version(db, scope)
+        key = f"{request.url.path}?{request.url.query}"
+        tag = hashlib.sha1(key.encode()).hexdigest()[:12]
+        headers = {
+            "ETag": f'"{tag}-{scope}-{version}"',
+            "Cache-Control": "no-cache",  # Revalidate, usually to a 304
+        }
+        if updated_at is not None:
+            headers["Last-Modified"] = format_datetime(
+                updated_at.replace(tzinfo=timezone.utc), usegmt=True
+            )
+
+        if self._not_modified(request, headers["ETag"]):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            body = entry[1]
+        else:
+            self.misses += 1
+            body = await build()
+            self._put(key, version, body)
+
+        return Response(body, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str) -> bool:
+        # If-Modified-Since is not honored: a date cannot tell apart two
+        # versions written within the same second
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is None:
+            return False
+        return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+    def _put(self, key: str, version: int, body: bytes) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[1])
+        if len(body) > self.max_bytes:
+            return
+
+        self._entries[key] = (version, body)
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(settings.response_cache_max_bytes)
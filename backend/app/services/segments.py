@@ -0,0 +1,73 @@
+from typing import Iterable
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Segment
+
+
+class SegmentWriter:
+    """Insert a material's segments in batches with Core executemany.
+
+    Segments can be added as they are produced; they are buffered and
+    written one batch (a single round-trip) at a time, numbered in the
+    order they were added. Rows go to the table directly, bypassing the
+    ORM unit of work, so loaded ``Material.segments`` collections are not
+    updated. The caller commits.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        material_id: int,
+        start_order: int = 0,
+        batch_size: int | None = None,
+    ):
+        self.db = db
+        self.material_id = material_id
+        self.batch_size = batch_size or settings.segment_insert_batch_size
+        self._next_order = start_order
+        self._pending: list[dict] = []
+        self.written = 0
+
+    async def add(self, segments: Iterable[dict]) -> None:
+        """Queue segments ({"text", "start", "end", "audio_path"?})."""
+        for seg in segments:
+            self._pending.append({
+                "material_id": self.material_id,
+                "text": seg["text"],
+                "start_time": seg.get("start", 0.0),
+                "end_time": seg.get("end", 0.0),
+                "audio_path": seg.get("audio_path"),
+                "order": self._next_order,
+            })
+            self._next_order += 1
+            if len(self._pending) >= self.batch_size:
+                await self.flush()
+
+    async def flush(self) -> int:
+        """Write all queued segments. Returns the number written."""
+        if not self._pending:
+            return 0
+
+        rows, self._pending = self._pending, []
+        await self.db.execute(insert(Segment.__table__), rows)
+        self.written += len(rows)
+        return len(rows)
+
+
+async def insert_segments(
+    db: AsyncSession,
+    material_id: int,
+    segments: Iterable[dict],
+    start_order: int = 0,
+) -> int:
+    """Insert segments of a material in batches. The caller commits.
+
+    Returns the number of segments inserted.
+    """
+    writer = SegmentWriter(db, material_id, start_order=start_order)
+    await writer.add(segments)
+    await writer.flush()
+    return writer.written
@@ -0,0 +1,330 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models import Job, Material, Practice, Segment
+from app.services.tts import tts_cache
+
+# Files derived from an audio file or recording, named after it
+SIDECAR_SUFFIXES = (".offsets.json", ".peaks", ".16k.wav")
+
+
+class StorageGC:
+    """Removes media files that no database row references any more.
+
+    Deleting a material enqueues its files (audio, thumbnail, segment
+    clips, practice recordings); a background task removes them in
+    batches, off the event loop, together with their sidecars. A file is
+    only removed if no remaining row references it, since cloned materials
+    share audio and clips. Files in the TTS cache are left to its own
+    eviction. A periodic sweep removes orphans left behind by crashes,
+    failed imports or deletions from before this existed.
+    """
+
+    # Orphan paths listed in a sweep report
+    REPORT_LIMIT = 200
+
+    def __init__(self):
+        self._pending: dict[str, None] = {}  # Insertion-ordered set
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self.files_removed = 0
+        self.bytes_reclaimed = 0
+        self.sweeps = 0
+        self.last_sweep: datetime | None = None
+
+    async def start(self) -> None:
+        """Start the batch deleter and, if enabled, the periodic sweeper."""
+        self._tasks = [asyncio.create_task(self._deleter())]
+        if settings.storage_gc_sweep_interval > 0:
+            self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        """Cancel background tasks. Queued removals are picked up by a sweep."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def material_files(self, db: AsyncSession, material_id: int) -> list[str]:
+        """Files referenced by a material, its segments and their practices."""
+        material = await db.get(Material, material_id)
+        if material is None:
+            return []
+
+        paths = [material.audio_path, material.thumbnail_path]
+        paths += (
+            await db.execute(
+                select(Segment.audio_path).where(Segment.material_id == material_id)
+            )
+        ).scalars()
+        paths += (
+            await db.execute(
+                select(Practice.recording_path)
+                .join(Segment, Practice.segment_id == Segment.id)
+                .where(Segment.material_id == material_id)
+            )
+        ).scalars()
+        return list(dict.fromkeys(path for path in paths if path))
+
+    def enqueue(self, paths: Iterable[str]) -> None:
+        """Queue files for removal once their rows are gone (after commit)."""
+        for path in paths:
+            self._pending[path] = None
+        if self._pending:
+            self._wakeup.set()
+
+    async def collect(self, paths: list[str]) -> dict:
+        """Remove the given files (and sidecars) that nothing references."""
+        candidates = [path for path in paths if self._is_collectable(path)]
+        async with async_session() as db:
+            referenced = await self._referenced(db, candidates)
+
+        unreferenced = [path for path in candidates if path not in referenced]
+        files, reclaimed = await asyncio.to_thread(
+            self._remove, self._with_sidecars(unreferenced)
+        )
+        return {"removed_files": files, "reclaimed_bytes": reclaimed}
+
+    async def sweep(self, dry_run: bool = False) -> dict:
+        """Find (and unless ``dry_run``, remove) unreferenced files on disk.
+
+        Materials whose import started more than ``storage_gc_grace_seconds``
+        ago and never finished (the process died) are deleted first, so
+        their files count as orphans. Files modified within the grace period
+        and files of unfinished import jobs are kept, so imports in progress
+        are safe.
+        """
+        async with async_session() as db:
+            stale_imports = await self._stale_imports(db)
+            if stale_imports and not dry_run:
+                await self._delete_materials(db, stale_imports)
+                await db.commit()
+
+        files = await asyncio.to_thread(self._scan)
+        async with async_session() as db:
+            referenced = await self._referenced(db)
+            if dry_run:
+                referenced -= set(await self._material_paths(db, stale_imports))
+
+        cutoff = time.time() - settings.storage_gc_grace_seconds
+        kept = {
+            path for path, _, mtime in files if path in referenced or mtime > cutoff
+        }
+        orphans = []
+        for path, size, mtime in files:
+            if path in kept:
+                continue
+            owner = self._sidecar_owner(path)
+            if owner is not None and (owner in kept or mtime > cutoff):
+                continue
+            orphans.append((path, size))
+
+        report = {
+            "dry_run": dry_run,
+            "stale_imports": len(stale_imports),
+            "scanned_files": len(files),
+            "orphan_files": len(orphans),
+            "orphan_bytes": sum(size for _, size in orphans),
+            "orphans": [
+                {"path": path, "size": size}
+                for path, size in orphans[: self.REPORT_LIMIT]
+            ],
+            "removed_files": 0,
+            "reclaimed_bytes": 0,
+        }
+        if not dry_run:
+            removed, reclaimed = await asyncio.to_thread(
+                self._remove, [path for path, _ in orphans]
+            )
+            report["removed_files"] = removed
+            report["reclaimed_bytes"] = reclaimed
+            self.sweeps += 1
+            self.last_sweep = datetime.utcnow()
+        return report
+
+    @staticmethod
+    async def _stale_imports(db: AsyncSession) -> list[int]:
+        cutoff = datetime.utcnow() - timedelta(
+            seconds=settings.storage_gc_grace_seconds
+        )
+        result = await db.execute(
+            select(Material.id).where(
+                Material.status == "importing", Material.created_at < cutoff
+            )
+        )
+        return list(result.scalars())
+
+    @staticmethod
+    async def _material_paths(db: AsyncSession, material_ids: list[int]) -> list[str]:
+        """Audio files of the given materials and their segments."""
+        if not material_ids:
+            return []
+        paths = list(
+            (
+                await db.execute(
+                    select(Material.audio_path).where(Material.id.in_(material_ids))
+                )
+            ).scalars()
+        )
+        paths += (
+            await db.execute(
+                select(Segment.audio_path).where(Segment.material_id.in_(material_ids))
+            )
+        ).scalars()
+        return [path for path in paths if path]
+
+    @staticmethod
+    async def _delete_materials(db: AsyncSession, material_ids: list[int]) -> None:
+        segment_ids = select(Segment.id).where(Segment.material_id.in_(material_ids))
+        await db.execute(delete(Practice).where(Practice.segment_id.in_(segment_ids)))
+        await db.execute(delete(Segment).where(Segment.material_id.in_(material_ids)))
+        await db.execute(delete(Material).where(Material.id.in_(material_ids)))
+
+    async def _deleter(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                batch = list(self._pending)[: settings.storage_gc_batch_size]
+                for path in batch:
+                    del self._pending[path]
+                try:
+                    await self.collect(batch)
+                except Exception as e:
+                    print(f"Storage GC Error: {e}")
+
+    async def _sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(settings.storage_gc_sweep_interval)
+            try:
+                report = await self.sweep()
+                if report["removed_files"]:
+                    print(
+                        f"Storage GC: removed {report['removed_files']} orphaned "
+                        f"files ({report['reclaimed_bytes']} bytes)"
+                    )
+            except Exception as e:
+                print(f"Storage GC sweep Error: {e}")
+
+    @staticmethod
+    async def _referenced(
+        db: AsyncSession, paths: list[str] | None = None
+    ) -> set[str]:
+        """Paths referenced by any row, limited to ``paths`` if given."""
+        columns = [
+            Material.audio_path,
+            Material.thumbnail_path,
+            Segment.audio_path,
+            Practice.recording_path,
+        ]
+        referenced = set()
+        if paths is None:
+            for column in columns:
+                referenced |= set((await db.execute(select(column))).scalars())
+
+            # Downloads of imports that have not saved their material yet
+            result = await db.execute(
+                select(Job.state).where(Job.status.in_(["pending", "running"]))
+            )
+            for state in result.scalars():
+                download = (state or {}).get("download") or {}
+                referenced.update(
+                    download.get(key) for key in ("audio_path", "thumbnail_path")
+                )
+        else:
+            for start in range(0, len(paths), 500):
+                chunk = paths[start : start + 500]
+                for column in columns:
+                    referenced |= set(
+                        (await db.execute(select(column).where(column.in_(chunk))))
+                        .scalars()
+                    )
+        referenced.discard(None)
+        return referenced
+
+    @staticmethod
+    def _roots() -> list[Path]:
+        return [settings.materials_dir, settings.recordings_dir]
+
+    def _is_collectable(self, path: str) -> bool:
+        """Only files in the data directories, and never TTS cache entries."""
+        resolved = Path(path).resolve()
+        if resolved.is_relative_to(tts_cache.directory.resolve()):
+            return False
+        return any(resolved.is_relative_to(root.resolve()) for root in self._roots())
+
+    @staticmethod
+    def _with_sidecars(paths: list[str]) -> list[str]:
+        return [
+            candidate
+            for path in paths
+            for candidate in [path] + [f"{path}{suffix}" for suffix in SIDECAR_SUFFIXES]
+        ]
+
+    @staticmethod
+    def _sidecar_owner(path: str) -> str | None:
+        for suffix in SIDECAR_SUFFIXES:
+            if path.endswith(suffix):
+                return path[: -len(suffix)]
+        return None
+
+    def _scan(self) -> list[tuple[str, int, float]]:
+        """(path, size, mtime) of every collectable file in the data directories."""
+        tts_directory = tts_cache.directory
+        files = []
+        for root in self._roots():
+            if not root.exists():
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [
+                    name for name in dirnames if Path(dirpath, name) != tts_directory
+                ]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _remove(self, paths: list[str]) -> tuple[int, int]:
+        """Delete files that exist. Returns (files removed, bytes reclaimed)."""
+        files = reclaimed = 0
+        for path in paths:
+            try:
+                size = os.stat(path).st_size
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"Storage GC could not remove {path}: {e}")
+                continue
+            files += 1
+            reclaimed += size
+
+        self.files_removed += files
+        self.bytes_reclaimed += reclaimed
+        return files, reclaimed
+
+    def stats(self) -> dict:
+        """Removal counters for this process."""
+        return {
+            "pending": len(self._pending),
+            "files_removed": self.files_removed,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "sweeps": self.sweeps,
+            "last_sweep": self.last_sweep.isoformat() if self.last_sweep else None,
+        }
+
+
+storage_gc = StorageGC()
@@ -1,16 +1,38 @@
 import asyncio
+import bisect
+import multiprocessing as mp
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
 from functools import lru_cache
+from typing import Callable
 
 from app.config import settings
+from app.services.cache import SqliteCache, hash_file, make_key
+from app.services.whisper_server import WhisperClient
+
+transcription_cache = SqliteCache(
+    "transcription", max_bytes=settings.transcription_cache_max_bytes
+)
 
 
 class TranscribeService:
     """Service for transcribing audio using faster-whisper."""
 
     _model = None
+    _batched_pipeline = None
+    _chunk_executor = None
+
+    # Sample rate expected by Whisper
+    SAMPLE_RATE = 16000
+    # Longest clip the batched pipeline transcribes in one piece
+    MAX_CLIP_SECONDS = 30.0
+
+    # faster-whisper options; part of the transcription cache key
+    SEGMENT_OPTIONS = {"language": "en", "task": "transcribe", "word_timestamps": True}
+    TEXT_OPTIONS = {"language": "en", "task": "transcribe"}
 
     @classmethod
-    def get_model(cls):
+    def get_model(cls, cpu_threads: int | None = None):
         """Get or create Whisper model (singleton)."""
         if cls._model is None:
             from faster_whisper import WhisperModel
@@ -19,24 +41,215 @@ class TranscribeService:
                 settings.whisper_model,
                 device=settings.whisper_device,
                 compute_type=settings.whisper_compute_type,
+                cpu_threads=cpu_threads or settings.whisper_cpu_threads,
             )
         return cls._model
 
-    async def transcribe(self, audio_path: str) -> list[dict]:
-        """Transcribe audio file and return segments."""
+    @classmethod
+    def get_batched_pipeline(cls):
+        """Get or create the batched inference pipeline (singleton)."""
+        if cls._batched_pipeline is None:
+            from faster_whisper import BatchedInferencePipeline
+
+            cls._batched_pipeline = BatchedInferencePipeline(model=cls.get_model())
+        return cls._batched_pipeline
+
+    @classmethod
+    def get_chunk_executor(cls) -> ProcessPoolExecutor:
+        """Get or create the process pool for long-audio chunks (singleton)."""
+        if cls._chunk_executor is None:
+            workers = max(settings.whisper_chunk_workers, 1)
+            cls._chunk_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(max((os.cpu_count() or 1) // workers, 1),),
+            )
+        return cls._chunk_executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the long-audio process pool, if it was started."""
+        executor, cls._chunk_executor = cls._chunk_executor, None
+        if executor is None:
+            return
+
+        # Do not wait for chunks being transcribed (minutes for long audio);
+        # their jobs were released by the job runner and resume on next start
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    @staticmethod
+    def _client() -> WhisperClient | None:
+        """Client for the Whisper inference server, if one is configured."""
+        if settings.whisper_server_address:
+            return WhisperClient(settings.whisper_server_address)
+        return None
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> list[dict]:
+        """Transcribe audio file and return segments.
+
+        Args:
+            audio_path: Path to the audio file
+            on_progress: Optional callback receiving the transcribed fraction
+                (0.0 - 1.0); called from a worker thread
+        """
+        key = await self._cache_key(audio_path, "segments", self.SEGMENT_OPTIONS)
+        segments = await transcription_cache.aget(key)
+        if segments is None:
+            segments = await self._transcribe_uncached(audio_path, on_progress)
+            await transcription_cache.aset(key, segments)
+        return segments
+
+    async def _cache_key(self, audio_path: str, kind: str, options: dict) -> str:
+        """Cache key from the audio content, model and transcribe options."""
+        audio_hash = await asyncio.to_thread(hash_file, audio_path)
+        return make_key(
+            audio_hash,
+            settings.whisper_model,
+            settings.whisper_compute_type,
+            kind,
+            options,
+        )
+
+    async def _transcribe_uncached(
+        self,
+        audio_path: str,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> list[dict]:
+        """Transcribe segments with Whisper, bypassing the cache."""
+        client = self._client()
+        if client:
+            return await client.call(
+                "transcribe", {"audio_path": audio_path}, on_progress
+            )
+
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._transcribe_sync, audio_path)
+        if settings.whisper_chunk_workers > 1:
+            duration = await loop.run_in_executor(
+                None, self.probe_duration, audio_path
+            )
+            if self.is_long_audio(duration):
+                return await self.transcribe_chunked(
+                    audio_path, self.get_chunk_executor(), on_progress
+                )
+
+        return await loop.run_in_executor(
+            None, self._transcribe_sync, audio_path, on_progress
+        )
+
+    @staticmethod
+    def probe_duration(audio_path: str) -> float:
+        """Read the audio duration from container metadata (0.0 if unknown)."""
+        try:
+            import av
+
+            with av.open(audio_path) as container:
+                if container.duration:
+                    return container.duration / av.time_base
+        except Exception:
+            pass
+        return 0.0
+
+    @staticmethod
+    def is_long_audio(duration: float) -> bool:
+        """Whether audio should be transcribed in parallel chunks."""
+        threshold = settings.whisper_long_audio_seconds
+        return threshold > 0 and duration >= threshold
+
+    async def transcribe_chunked(
+        self,
+        audio_path: str,
+        executor: Executor,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> list[dict]:
+        """Transcribe long audio as silence-aligned chunks in parallel.
+
+        The audio is decoded once, split at VAD-detected silences into chunks
+        of about ``whisper_chunk_seconds``, and each chunk is transcribed on
+        ``executor``. Segment timestamps are shifted back to global time.
+        """
+        from faster_whisper import decode_audio
+
+        loop = asyncio.get_event_loop()
+        audio = await loop.run_in_executor(
+            None, decode_audio, audio_path, self.SAMPLE_RATE
+        )
+        chunks = await loop.run_in_executor(None, self._plan_chunks, audio)
+
+        total = len(audio) or 1
+        done = 0
+
+        async def run_chunk(start: int, end: int) -> list[dict]:
+            nonlocal done
+            segments = await loop.run_in_executor(
+                executor, _transcribe_chunk, audio[start:end], start / self.SAMPLE_RATE
+            )
+            done += end - start
+            if on_progress:
+                on_progress(done / total)
+            return segments
+
+        results = await asyncio.gather(
+            *(run_chunk(start, end) for start, end in chunks)
+        )
+        return [segment for segments in results for segment in segments]
+
+    def _plan_chunks(self, audio) -> list[tuple[int, int]]:
+        """Split audio into contiguous (start, end) sample ranges.
 
-    def _transcribe_sync(self, audio_path: str) -> list[dict]:
+        Cuts are placed in the middle of the silence that follows the speech
+        region where a chunk reaches ``whisper_chunk_seconds``, so no
+        sentence is split across chunks.
+        """
+        target = int(settings.whisper_chunk_seconds * self.SAMPLE_RATE)
+        if len(audio) <= target:
+            return [(0, len(audio))]
+
+        try:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+            speech = get_speech_timestamps(
+                audio,
+                VadOptions(min_silence_duration_ms=500),
+                sampling_rate=self.SAMPLE_RATE,
+            )
+        except Exception:
+            speech = []
+
+        if not speech:
+            # No VAD available: fall back to fixed-size chunks
+            return [
+                (start, min(start + target, len(audio)))
+                for start in range(0, len(audio), target)
+            ]
+
+        chunks = []
+        chunk_start = 0
+        for region, next_region in zip(speech, speech[1:]):
+            if region["end"] - chunk_start >= target:
+                cut = (region["end"] + next_region["start"]) // 2
+                chunks.append((chunk_start, cut))
+                chunk_start = cut
+        chunks.append((chunk_start, len(audio)))
+
+        return chunks
+
+    def _transcribe_sync(
+        self,
+        audio_path: str,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> list[dict]:
         """Synchronous transcription."""
         model = self.get_model()
 
-        segments_iter, info = model.transcribe(
-            audio_path,
-            language="en",
-            task="transcribe",
-            word_timestamps=True,
-        )
+        segments_iter, info = model.transcribe(audio_path, **self.SEGMENT_OPTIONS)
 
         segments = []
         for segment in segments_iter:
@@ -45,25 +258,37 @@ class TranscribeService:
                 "start": segment.start,
                 "end": segment.end,
             })
+            if on_progress and info.duration:
+                on_progress(segment.end / info.duration)
 
         return segments
 
     async def transcribe_single(self, audio_path: str) -> dict:
         """Transcribe audio file and return single text."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self._transcribe_single_sync, audio_path
-        )
+        key = await self._cache_key(audio_path, "text", self.TEXT_OPTIONS)
+        result = await transcription_cache.aget(key)
+        if result is not None:
+            return result
+
+        client = self._client()
+        if client:
+            result = await client.call(
+                "transcribe_single", {"audio_path": audio_path}
+            )
+        else:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                None, self._transcribe_single_sync, audio_path
+            )
+
+        await transcription_cache.aset(key, result)
+        return result
 
     def _transcribe_single_sync(self, audio_path: str) -> dict:
         """Synchronous single transcription."""
         model = self.get_model()
 
-        segments_iter, info = model.transcribe(
-            audio_path,
-            language="en",
-            task="transcribe",
-        )
+        segments_iter, info = model.transcribe(audio_path, **self.TEXT_OPTIONS)
 
         text_parts = []
         for segment in segments_iter:
@@ -74,3 +299,127 @@ class TranscribeService:
             "language": info.language,
             "duration": info.duration,
         }
+
+    async def transcribe_batch(self, audio_paths: list[str]) -> list[dict]:
+        """Transcribe several short recordings in one batched pass.
+
+        Returns one result per path, in order, shaped like transcribe_single.
+        A recording that cannot be read or decoded gets ``{"error": message}``
+        instead, without failing the others. Cached recordings are skipped;
+        only misses go through Whisper.
+        """
+        keys: list[str | None] = []
+        results: list[dict | None] = []
+        for path in audio_paths:
+            try:
+                key = await self._cache_key(path, "text", self.TEXT_OPTIONS)
+            except Exception as e:
+                keys.append(None)
+                results.append({"error": f"Cannot read recording: {e}"})
+                continue
+            keys.append(key)
+            results.append(await transcription_cache.aget(key))
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        paths = [audio_paths[i] for i in missing]
+        client = self._client()
+        if client:
+            transcribed = await client.call("transcribe_batch", {"audio_paths": paths})
+        else:
+            loop = asyncio.get_event_loop()
+            transcribed = await loop.run_in_executor(
+                None, self._transcribe_batch_sync, paths
+            )
+
+        for i, result in zip(missing, transcribed):
+            results[i] = result
+            if "error" not in result:
+                await transcription_cache.aset(keys[i], result)
+        return results
+
+    def _transcribe_batch_sync(self, audio_paths: list[str]) -> list[dict]:
+        """Synchronous batched transcription.
+
+        All recordings are decoded, concatenated and passed to the batched
+        pipeline with one clip per recording (split at MAX_CLIP_SECONDS), so
+        Whisper runs them together in batches instead of one by one.
+        Recordings that fail to decode are left out and get an error result.
+        """
+        import numpy as np
+        from faster_whisper import decode_audio
+
+        audios: list = []
+        errors: list[str | None] = []
+        for path in audio_paths:
+            try:
+                audios.append(decode_audio(path, sampling_rate=self.SAMPLE_RATE))
+                errors.append(None)
+            except Exception as e:
+                audios.append(np.zeros(0, dtype=np.float32))
+                errors.append(f"Cannot decode recording: {e}")
+
+        clips = []  # {"start", "end"} in seconds over the concatenated audio
+        owners = []  # index of the recording each clip belongs to
+        offset = 0
+        max_samples = int(self.MAX_CLIP_SECONDS * self.SAMPLE_RATE)
+        for index, audio in enumerate(audios):
+            for start in range(0, len(audio), max_samples):
+                end = min(start + max_samples, len(audio))
+                clips.append({
+                    "start": (offset + start) / self.SAMPLE_RATE,
+                    "end": (offset + end) / self.SAMPLE_RATE,
+                })
+                owners.append(index)
+            offset += len(audio)
+
+        text_parts: list[list[str]] = [[] for _ in audio_paths]
+        if clips:
+            segments_iter, info = self.get_batched_pipeline().transcribe(
+                np.concatenate(audios),
+                **self.TEXT_OPTIONS,
+                clip_timestamps=clips,
+                batch_size=settings.whisper_batch_size,
+            )
+
+            clip_starts = [clip["start"] for clip in clips]
+            for segment in segments_iter:
+                # Segments come back in clip order; map each to its clip
+                clip_index = max(
+                    0, bisect.bisect_right(clip_starts, segment.start + 1e-3) - 1
+                )
+                text_parts[owners[clip_index]].append(segment.text.strip())
+
+        return [
+            {"error": error}
+            if error
+            else {
+                "text": " ".join(parts),
+                "language": "en",
+                "duration": len(audio) / self.SAMPLE_RATE,
+            }
+            for parts, audio, error in zip(text_parts, audios, errors)
+        ]
+
+
+def _init_chunk_worker(cpu_threads: int) -> None:
+    """Load the model once in each long-audio worker process."""
+    TranscribeService.get_model(cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(audio, offset: float) -> list[dict]:
+    """Transcribe one chunk of samples; runs in a worker process."""
+    model = TranscribeService.get_model()
+
+    segments_iter, info = model.transcribe(audio, **TranscribeService.SEGMENT_OPTIONS)
+
+    return [
+        {
+            "text": segment.text.strip(),
+            "start": segment.start + offset,
+            "end": segment.end + offset,
+        }
+        for segment in segments_iter
+    ]
@@ -1,8 +1,141 @@
 import asyncio
+import os
+import random
+import time
+import uuid
 from pathlib import Path
 from datetime import datetime
+from sqlalchemy import select
 
 from app.config import settings
+from app.database import async_session
+from app.models import Material, Segment
+from app.services.audio import AudioService
+from app.services.cache import SqliteCache, make_key
+
+
+class TtsCache:
+    """Content-addressed store of synthesized audio.
+
+    Each mp3 is stored once under ``materials_dir/tts_cache``, named by a
+    hash of the normalized text, voice and rate, with its duration kept in
+    the SQLite cache index. Segments reference the cached files directly,
+    so eviction never removes a file that a segment or material still uses.
+    """
+
+    # Recently used files are never evicted, so an import that just got a
+    # cache hit can still save its segments
+    EVICTION_GRACE_SECONDS = 3600
+
+    def __init__(self):
+        self.index = SqliteCache("tts", max_bytes=16 * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evicted_files = 0
+
+    @property
+    def directory(self) -> Path:
+        return settings.materials_dir / "tts_cache"
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so equivalent sentences share an entry."""
+        return " ".join(text.split())
+
+    def key(self, text: str) -> str:
+        return make_key(self.normalize(text), settings.tts_voice, settings.tts_rate)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    async def get(self, key: str) -> dict | None:
+        """Return {"path", "duration"} for a cached entry, or None."""
+        path = self.path_for(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        entry = await self.index.aget(key)
+        if entry is None:
+            # Index entry was evicted; the file itself is still valid
+            entry = {"duration": TtsService._get_duration(str(path))}
+            await self.index.aset(key, entry)
+
+        # Touch the file so eviction sees it as recently used
+        os.utime(path)
+        self.hits += 1
+        return {"path": str(path), "duration": entry["duration"]}
+
+    async def put(self, key: str, duration: float) -> None:
+        await self.index.aset(key, {"duration": duration})
+
+    async def evict(self) -> int:
+        """Remove least recently used, unreferenced files over the size budget.
+
+        Returns the number of files removed.
+        """
+        files = await asyncio.to_thread(self._scan)
+        total = sum(size for _, size, _ in files)
+        if total <= settings.tts_cache_max_bytes:
+            return 0
+
+        prefix = f"{self.directory}{os.sep}%"
+        async with async_session() as db:
+            referenced = set(
+                (
+                    await db.execute(
+                        select(Segment.audio_path).where(
+                            Segment.audio_path.like(prefix)
+                        )
+                    )
+                ).scalars()
+            )
+            referenced |= set(
+                (
+                    await db.execute(
+                        select(Material.audio_path).where(
+                            Material.audio_path.like(prefix)
+                        )
+                    )
+                ).scalars()
+            )
+
+        cutoff = time.time() - self.EVICTION_GRACE_SECONDS
+        target = settings.tts_cache_max_bytes * 0.9
+        removed = 0
+        for path, size, mtime in sorted(files, key=lambda f: f[2]):
+            if total <= target or mtime > cutoff:
+                break
+            if str(path) in referenced:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        self.evicted_files += removed
+        return removed
+
+    def _scan(self) -> list[tuple[Path, int, float]]:
+        if not self.directory.exists():
+            return []
+        files = []
+        for path in self.directory.glob("*.mp3"):
+            stat = path.stat()
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evicted_files": self.evicted_files,
+            "max_bytes": settings.tts_cache_max_bytes,
+        }
+
+
+tts_cache = TtsCache()
 
 
 class TtsService:
@@ -11,6 +144,41 @@ class TtsService:
     def __init__(self):
         settings.ensure_directories()
 
+    @staticmethod
+    def _transient_errors() -> tuple[type[BaseException], ...]:
+        """Exception types worth retrying (network and service hiccups)."""
+        errors: list[type[BaseException]] = [OSError, asyncio.TimeoutError]
+        try:
+            from edge_tts.exceptions import NoAudioReceived, WebSocketError
+
+            errors += [NoAudioReceived, WebSocketError]
+        except ImportError:
+            pass
+        try:
+            import aiohttp
+
+            errors.append(aiohttp.ClientError)
+        except ImportError:
+            pass
+        return tuple(errors)
+
+    async def generate_audio_with_retry(self, text: str, output_path: str) -> dict:
+        """Generate audio, retrying transient failures with exponential backoff."""
+        transient = self._transient_errors()
+        attempts = max(settings.tts_max_retries, 0) + 1
+
+        for attempt in range(attempts):
+            try:
+                return await self.generate_audio(text, output_path)
+            except transient as e:
+                Path(output_path).unlink(missing_ok=True)
+                if attempt == attempts - 1:
+                    raise
+                delay = settings.tts_retry_backoff * (2 ** attempt)
+                delay *= random.uniform(0.5, 1.5)
+                print(f"  TTS retry {attempt + 1}/{attempts - 1} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
     async def generate_audio(self, text: str, output_path: str) -> dict:
         """Generate audio from text using edge-tts."""
         import edge_tts
@@ -31,27 +199,56 @@ class TtsService:
         }
 
     async def generate_audio_segments(
-        self, text_segments: list[dict]
+        self, text_segments: list[dict], start_time: float = 0.0
     ) -> list[dict]:
-        """Generate audio for multiple text segments."""
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        results = []
-        current_time = 0.0
+        """Generate audio for multiple text segments.
+
+        Segments are synthesized concurrently (up to ``tts_concurrency`` at a
+        time) and returned in input order with cumulative start/end times.
+        Audio comes from the TTS cache when the same sentence was synthesized
+        before with the same voice and rate; repeated sentences within one
+        import are synthesized only once.
+        """
         total = len(text_segments)
+        semaphore = asyncio.Semaphore(max(settings.tts_concurrency, 1))
+        tts_cache.directory.mkdir(parents=True, exist_ok=True)
+        pending: dict[str, asyncio.Task] = {}
 
         print(f"Generating TTS for {total} segments...")
 
-        for i, seg in enumerate(text_segments):
-            output_path = str(
-                settings.materials_dir / f"tts_{timestamp}_{i:04d}.mp3"
-            )
+        async def synthesize(i: int, key: str, text: str) -> dict:
+            cached = await tts_cache.get(key)
+            if cached:
+                return cached
+
+            path = tts_cache.path_for(key)
+            temp_path = str(path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp"))
+            async with semaphore:
+                print(f"  [{i+1}/{total}] Generating: {text[:50]}...")
+                audio_info = await self.generate_audio_with_retry(text, temp_path)
 
-            print(f"  [{i+1}/{total}] Generating: {seg['text'][:50]}...")
-            audio_info = await self.generate_audio(seg["text"], output_path)
+            # Publish atomically so readers never see a partial file
+            os.replace(temp_path, path)
+            await tts_cache.put(key, audio_info["duration"])
+            return {"path": str(path), "duration": audio_info["duration"]}
 
+        # TaskGroup cancels the remaining segments if one fails for good
+        async with asyncio.TaskGroup() as group:
+            tasks = []
+            for i, seg in enumerate(text_segments):
+                text = tts_cache.normalize(seg["text"])
+                key = tts_cache.key(text)
+                if key not in pending:
+                    pending[key] = group.create_task(synthesize(i, key, text))
+                tasks.append(pending[key])
+        audio_infos = [task.result() for task in tasks]
+
+        results = []
+        current_time = start_time
+        for seg, audio_info in zip(text_segments, audio_infos):
             results.append({
                 "text": seg["text"],
-                "audio_path": output_path,
+                "audio_path": audio_info["path"],
                 "start": current_time,
                 "end": current_time + audio_info["duration"],
                 "duration": audio_info["duration"],
@@ -62,34 +259,27 @@ class TtsService:
         print(f"TTS generation complete. Total duration: {current_time:.1f}s")
         return results
 
-    async def combine_segments(self, segments: list[dict]) -> dict:
-        """Combine multiple audio segments into one file using pydub."""
+    async def combine_segments(
+        self, segments: list[dict], output_path: str | None = None
+    ) -> dict:
+        """Combine multiple audio segments into one continuous file.
+
+        Returns the combined path, duration and per-segment offset table
+        (also written next to the file; see AudioService.concatenate).
+        """
         if not segments:
             raise ValueError("No segments to combine")
 
-        from pydub import AudioSegment
-
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        output_path = str(settings.materials_dir / f"combined_{timestamp}.mp3")
-
-        # Combine audio segments
-        combined = AudioSegment.empty()
-        for seg in segments:
-            audio = AudioSegment.from_mp3(seg['audio_path'])
-            combined += audio
-
-        # Export combined audio
-        combined.export(output_path, format="mp3")
+        if output_path is None:
+            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            output_path = str(settings.materials_dir / f"combined_{timestamp}.mp3")
 
-        # Get total duration
-        duration = len(combined) / 1000.0  # pydub uses milliseconds
-
-        return {
-            "path": output_path,
-            "duration": duration,
-        }
+        return await AudioService().concatenate(
+            [seg["audio_path"] for seg in segments], output_path
+        )
 
-    def _get_duration(self, audio_path: str) -> float:
+    @staticmethod
+    def _get_duration(audio_path: str) -> float:
         """Get audio duration using mutagen."""
         try:
             from mutagen.mp3 import MP3
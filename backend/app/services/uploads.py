@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from pathlib import Path
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Bytes read from an upload per chunk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """An upload exceeded its size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the limit of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def spool_upload(
+    file: UploadFile,
+    path: Path,
+    max_bytes: int | None = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> dict:
+    """Copy an upload to disk in fixed-size chunks, off the event loop.
+
+    The file is written under a temporary name and renamed into place once
+    complete, so ``path`` never holds a partial upload. Raises
+    UploadTooLargeError as soon as more than ``max_bytes`` arrive.
+
+    Returns {"path", "size", "sha256"}; the hash is computed while copying.
+    """
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+
+    f = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        try:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+    return {"path": path, "size": size, "sha256": digest.hexdigest()}
+
+
+class UploadLimitMiddleware:
+    """Reject oversized request bodies on upload routes with 413.
+
+    ``limits`` maps path regexes to byte limits for POST requests. A
+    declared Content-Length over the limit is refused before the body is
+    read; otherwise the body is counted as it streams in, so multipart
+    parsing stops as soon as the limit is passed.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        self.app = app
+        self.limits = [
+            (re.compile(pattern), limit) for pattern, limit in limits.items()
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            for pattern, limit in self.limits:
+                if pattern.fullmatch(scope["path"]):
+                    max_bytes = limit
+                    break
+
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse(
+                {"detail": str(UploadTooLargeError(max_bytes))}, status_code=413
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise HTTPException(
+                        status_code=413, detail=str(UploadTooLargeError(max_bytes))
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,234 @@
+import asyncio
+import os
+import struct
+from pathlib import Path
+
+
+class WaveformService:
+    """Multi-resolution waveform peaks stored in a binary sidecar.
+
+    Audio is decoded once to mono PCM and reduced to (min, max) int16
+    pairs per block of samples. Each coarser level merges ``LEVEL_FACTOR``
+    blocks of the previous one. All levels live in ``{audio}.peaks``,
+    which is memory-mapped for reads and rebuilt when the audio changes.
+    """
+
+    MAGIC = b"PEAK"
+    VERSION = 1
+    # magic, version, sample rate, source size, source mtime_ns, level count
+    HEADER = struct.Struct("<4sHIQQH")
+    # samples per peak, peak count, byte offset of the level's data
+    LEVEL = struct.Struct("<IIQ")
+
+    SAMPLE_RATE = 8000  # Decode rate; plenty for drawing a waveform
+    BASE_BLOCK = 64  # Samples per peak at the finest level (8 ms)
+    LEVEL_FACTOR = 4
+    LEVEL_COUNT = 6  # 64 .. 65536 samples per peak
+
+    MAX_POINTS = 10000
+
+    _locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def peaks_path(audio_path: str) -> Path:
+        """Sidecar file holding the peaks of an audio file."""
+        return Path(f"{audio_path}.peaks")
+
+    async def get_peaks(
+        self,
+        audio_path: str,
+        start: float = 0.0,
+        end: float | None = None,
+        points: int = 1000,
+    ) -> dict:
+        """Min/max peaks for a time window, reduced to at most ``points``.
+
+        Peaks are normalized to -1.0 - 1.0. The sidecar is built on first use.
+        """
+        await self.ensure_peaks(audio_path)
+        return await asyncio.to_thread(
+            self._read_window, audio_path, start, end, points
+        )
+
+    async def ensure_peaks(self, audio_path: str) -> Path:
+        """Build the peaks sidecar unless an up-to-date one exists."""
+        peaks_path = self.peaks_path(audio_path)
+        lock = self._locks.setdefault(str(peaks_path), asyncio.Lock())
+        async with lock:
+            if not await asyncio.to_thread(self._is_current, audio_path):
+                base = await self._decode_base_peaks(audio_path)
+                await asyncio.to_thread(self._write, audio_path, base)
+        return peaks_path
+
+    def _is_current(self, audio_path: str) -> bool:
+        try:
+            with open(self.peaks_path(audio_path), "rb") as f:
+                header = f.read(self.HEADER.size)
+        except FileNotFoundError:
+            return False
+
+        if len(header) != self.HEADER.size:
+            return False
+        magic, version, _, size, mtime_ns, _ = self.HEADER.unpack(header)
+        source = os.stat(audio_path)
+        return (
+            magic == self.MAGIC
+            and version == self.VERSION
+            and size == source.st_size
+            and mtime_ns == source.st_mtime_ns
+        )
+
+    async def _decode_base_peaks(self, audio_path: str):
+        """Decode to PCM with ffmpeg and reduce it to finest-level peaks.
+
+        PCM is processed as it streams in, so memory stays bounded by the
+        peaks rather than the decoded audio.
+        """
+        import numpy as np
+
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-i", audio_path,
+            "-f", "s16le",
+            "-ac", "1",
+            "-ar", str(self.SAMPLE_RATE),
+            "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        block_bytes = self.BASE_BLOCK * 2
+        read_size = block_bytes * 1024
+        pending = b""
+        parts = []
+        while chunk := await process.stdout.read(read_size):
+            pending += chunk
+            usable = len(pending) - len(pending) % block_bytes
+            if usable:
+                parts.append(self._block_peaks(pending[:usable]))
+                pending = pending[usable:]
+
+        if await process.wait() != 0:
+            raise Exception(f"Failed to decode audio: {audio_path}")
+
+        if len(pending) >= 2:
+            # Pad the final partial block by repeating its last sample
+            samples = np.frombuffer(pending[: len(pending) - len(pending) % 2], "<i2")
+            padded = np.pad(samples, (0, self.BASE_BLOCK - len(samples)), mode="edge")
+            parts.append(self._block_peaks(padded.tobytes()))
+
+        if not parts:
+            return np.zeros((0, 2), dtype=np.int16)
+        return np.concatenate(parts)
+
+    def _block_peaks(self, pcm: bytes):
+        import numpy as np
+
+        blocks = np.frombuffer(pcm, dtype="<i2").reshape(-1, self.BASE_BLOCK)
+        return np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=1)
+
+    def _write(self, audio_path: str, base) -> None:
+        """Write all levels derived from ``base`` to the sidecar atomically."""
+        import numpy as np
+
+        levels = [(self.BASE_BLOCK, base.astype("<i2"))]
+        for _ in range(self.LEVEL_COUNT - 1):
+            block, peaks = levels[-1]
+            if len(peaks) <= 1:
+                break
+            # Pad with the last pair so the tail still forms a full group
+            pad = -len(peaks) % self.LEVEL_FACTOR
+            peaks = np.concatenate([peaks, np.repeat(peaks[-1:], pad, axis=0)])
+            groups = peaks.reshape(-1, self.LEVEL_FACTOR, 2)
+            merged = np.stack(
+                [groups[:, :, 0].min(axis=1), groups[:, :, 1].max(axis=1)], axis=1
+            )
+            levels.append((block * self.LEVEL_FACTOR, merged))
+
+        source = os.stat(audio_path)
+        offset = self.HEADER.size + self.LEVEL.size * len(levels)
+        table = b""
+        for block, peaks in levels:
+            table += self.LEVEL.pack(block, len(peaks), offset)
+            offset += peaks.nbytes
+
+        header = self.HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            self.SAMPLE_RATE,
+            source.st_size,
+            source.st_mtime_ns,
+            len(levels),
+        )
+
+        peaks_path = self.peaks_path(audio_path)
+        temp_path = peaks_path.with_name(f"{peaks_path.name}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            f.write(table)
+            for _, peaks in levels:
+                f.write(peaks.tobytes())
+        os.replace(temp_path, peaks_path)
+
+    def _read_levels(self, audio_path: str) -> tuple[int, list[tuple[int, int, int]]]:
+        with open(self.peaks_path(audio_path), "rb") as f:
+            header = self.HEADER.unpack(f.read(self.HEADER.size))
+            sample_rate, level_count = header[2], header[5]
+            levels = [
+                self.LEVEL.unpack(f.read(self.LEVEL.size)) for _ in range(level_count)
+            ]
+        return sample_rate, levels
+
+    def _read_window(
+        self, audio_path: str, start: float, end: float | None, points: int
+    ) -> dict:
+        import numpy as np
+
+        sample_rate, levels = self._read_levels(audio_path)
+        base_block, base_count, _ = levels[0]
+        duration = base_count * base_block / sample_rate
+
+        start = min(max(start, 0.0), duration)
+        end = duration if end is None else min(max(end, start), duration)
+        points = min(max(points, 1), self.MAX_POINTS)
+
+        # Coarsest level that still has at least ``points`` peaks in the window
+        window_samples = (end - start) * sample_rate
+        block, count, offset = levels[0]
+        for level in levels:
+            if window_samples / level[0] >= points:
+                block, count, offset = level
+
+        first = int(start * sample_rate // block)
+        last = min(int(np.ceil(end * sample_rate / block)), count)
+        if last > first:
+            peaks = np.memmap(
+                self.peaks_path(audio_path),
+                dtype="<i2",
+                mode="r",
+                offset=offset,
+                shape=(count, 2),
+            )
+            window = np.asarray(peaks[first:last])
+        else:
+            window = np.zeros((0, 2), dtype=np.int16)
+
+        if len(window) > points:
+            bounds = np.linspace(0, len(window), points + 1).astype(int)[:-1]
+            window = np.stack(
+                [
+                    np.minimum.reduceat(window[:, 0], bounds),
+                    np.maximum.reduceat(window[:, 1], bounds),
+                ],
+                axis=1,
+            )
+
+        scale = 1 / 32768
+        return {
+            "start": start,
+            "end": end,
+            "duration": duration,
+            "points": len(window),
+            "min": np.round(window[:, 0] * scale, 4).tolist(),
+            "max": np.round(window[:, 1] * scale, 4).tolist(),
+        }
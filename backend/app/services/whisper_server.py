@@ -0,0 +1,291 @@
+"""Out-of-process Whisper inference server.
+
+Owns a fixed number of faster-whisper model replicas, each in its own
+process pinned to a slice of the CPU cores, and serves transcription
+requests to any number of web workers over a unix socket or localhost TCP.
+
+Run with::
+
+    python -m app.services.whisper_server --address unix:/tmp/whisper.sock
+
+and set ``WHISPER_SERVER_ADDRESS`` to the same value for the web app.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing as mp
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from app.config import settings
+
+# Stream buffer limit; transcripts of long videos are sent as a single line
+STREAM_LIMIT = 64 * 1024 * 1024
+
+# Seconds a progress poll blocks its thread, bounding how long shutdown waits
+PROGRESS_POLL_SECONDS = 0.5
+
+# Set in each replica process by _init_replica
+_progress_queue = None
+
+
+def parse_address(address: str) -> tuple[str, str | tuple[str, int]]:
+    """Parse ``unix:/path/to.sock`` or ``tcp:host:port``."""
+    scheme, _, rest = address.partition(":")
+    if scheme == "unix" and rest:
+        return "unix", rest
+    if scheme == "tcp" and rest:
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(
+        f"Invalid Whisper server address '{address}' "
+        "(expected 'unix:/path/to.sock' or 'tcp:host:port')"
+    )
+
+
+async def _open_connection(address: str):
+    kind, target = parse_address(address)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(target, limit=STREAM_LIMIT)
+    return await asyncio.open_connection(*target, limit=STREAM_LIMIT)
+
+
+def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write((json.dumps(message) + "\n").encode())
+
+
+class WhisperClient:
+    """Async client for the Whisper inference server."""
+
+    def __init__(self, address: str):
+        self.address = address
+
+    async def call(
+        self,
+        op: str,
+        params: dict,
+        on_progress: Callable[[float], None] | None = None,
+    ):
+        """Run an operation on the server and return its result."""
+        reader, writer = await _open_connection(self.address)
+        try:
+            _send(writer, {"op": op, "params": params})
+            await writer.drain()
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Whisper server closed the connection")
+
+                message = json.loads(line)
+                if "progress" in message:
+                    if on_progress:
+                        on_progress(message["progress"])
+                    continue
+                if "error" in message:
+                    raise RuntimeError(f"Whisper server: {message['error']}")
+                return message["result"]
+
+        finally:
+            writer.close()
+
+
+def _plan_core_groups(replicas: int) -> list[list[int]]:
+    """Split the available CPU cores into one contiguous group per replica."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+
+    replicas = max(1, min(replicas, len(cores)))
+    size, extra = divmod(len(cores), replicas)
+    groups = []
+    start = 0
+    for i in range(replicas):
+        # The first ``extra`` groups take one of the leftover cores each
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+def _init_replica(cores_queue, progress_queue) -> None:
+    """Pin a replica process to its cores and load the model."""
+    from app.services.transcribe import TranscribeService
+
+    global _progress_queue
+    _progress_queue = progress_queue
+
+    cores = cores_queue.get()
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    TranscribeService.get_model(cpu_threads=len(cores))
+
+
+def _run_in_replica(op: str, request_id: int, params: dict):
+    """Execute a request inside a replica process."""
+    from app.services.transcribe import TranscribeService
+
+    service = TranscribeService()
+
+    if op == "transcribe":
+        def on_progress(fraction: float) -> None:
+            _progress_queue.put((request_id, fraction))
+
+        return service._transcribe_sync(params["audio_path"], on_progress)
+    if op == "transcribe_single":
+        return service._transcribe_single_sync(params["audio_path"])
+    if op == "transcribe_batch":
+        return service._transcribe_batch_sync(params["audio_paths"])
+
+    raise ValueError(f"Unknown operation: {op}")
+
+
+class WhisperServer:
+    """Serves transcription requests from a pool of model replicas."""
+
+    def __init__(self, address: str, replicas: int):
+        self.address = address
+        self.core_groups = _plan_core_groups(replicas)
+        self._ids = itertools.count(1)
+        self._listeners: dict[int, Callable[[float], None]] = {}
+        self._stopping = False
+
+        ctx = mp.get_context("spawn")
+        cores_queue = ctx.Queue()
+        for group in self.core_groups:
+            cores_queue.put(group)
+        self._progress_queue = ctx.Queue()
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=len(self.core_groups),
+            mp_context=ctx,
+            initializer=_init_replica,
+            initargs=(cores_queue, self._progress_queue),
+        )
+
+    async def serve_forever(self) -> None:
+        """Accept connections until cancelled."""
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            Path(target).unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(
+                self._handle, target, limit=STREAM_LIMIT
+            )
+        else:
+            server = await asyncio.start_server(
+                self._handle, *target, limit=STREAM_LIMIT
+            )
+
+        print(
+            f"Whisper server listening on {self.address} "
+            f"({len(self.core_groups)} replicas, cores {self.core_groups})"
+        )
+
+        progress_task = asyncio.create_task(self._dispatch_progress())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._stopping = True
+            progress_task.cancel()
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _dispatch_progress(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            update = await loop.run_in_executor(None, self._next_progress)
+            if update is None:
+                continue
+            request_id, fraction = update
+            listener = self._listeners.get(request_id)
+            if listener:
+                listener(fraction)
+
+    def _next_progress(self) -> tuple[int, float] | None:
+        """Wait briefly for a progress update; None if there was none.
+
+        Runs in an executor thread, which cancelling the dispatch task
+        cannot interrupt, so it never blocks for long.
+        """
+        try:
+            return self._progress_queue.get(timeout=PROGRESS_POLL_SECONDS)
+        except queue.Empty:
+            return None
+
+    async def _execute(self, op: str, request_id: int, params: dict):
+        """Run a request, fanning long audio out across all replicas."""
+        from app.services.transcribe import TranscribeService
+
+        loop = asyncio.get_running_loop()
+
+        if op == "transcribe":
+            duration = await loop.run_in_executor(
+                None, TranscribeService.probe_duration, params["audio_path"]
+            )
+            if TranscribeService.is_long_audio(duration):
+                return await TranscribeService().transcribe_chunked(
+                    params["audio_path"],
+                    self._pool,
+                    self._listeners.get(request_id),
+                )
+
+        return await loop.run_in_executor(
+            self._pool, _run_in_replica, op, request_id, params
+        )
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        request_id = next(self._ids)
+
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line)
+
+            self._listeners[request_id] = lambda fraction: _send(
+                writer, {"progress": fraction}
+            )
+            try:
+                result = await self._execute(
+                    request["op"], request_id, request.get("params", {})
+                )
+                _send(writer, {"result": result})
+            except Exception as e:
+                _send(writer, {"error": f"{type(e).__name__}: {str(e)}"})
+
+            await writer.drain()
+
+        except (ConnectionError, json.JSONDecodeError) as e:
+            print(f"Whisper server connection error: {e}")
+
+        finally:
+            self._listeners.pop(request_id, None)
+            writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Whisper inference server")
+    parser.add_argument("--address", default=settings.whisper_server_address)
+    parser.add_argument("--replicas", type=int, default=settings.whisper_replicas)
+    args = parser.parse_args()
+
+    if not args.address:
+        parser.error("--address or WHISPER_SERVER_ADDRESS is required")
+
+    server = WhisperServer(args.address, args.replicas)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
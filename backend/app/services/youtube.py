@@ -1,24 +1,117 @@
 import asyncio
+import re
+import uuid
 from pathlib import Path
 from datetime import datetime
+from typing import Callable
+from urllib.parse import urlparse, parse_qs
+from sqlalchemy import select, insert, literal, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models import Material, Segment
+from app.services.audio import AudioService
+from app.services.jobs import JobContext
+from app.services.response_cache import response_cache
+from app.services.segments import insert_segments
+from app.services.transcribe import TranscribeService
 
 
 class YouTubeService:
     """Service for downloading videos from YouTube."""
 
+    VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
     def __init__(self):
         settings.ensure_directories()
 
-    async def download(self, url: str) -> dict:
+    @classmethod
+    def extract_video_id(cls, url: str) -> str | None:
+        """Normalize a YouTube URL to its 11-character video ID."""
+        parsed = urlparse(url.strip() if "://" in url else f"https://{url.strip()}")
+        host = (parsed.hostname or "").lower()
+        parts = [part for part in parsed.path.split("/") if part]
+
+        candidate = None
+        if host == "youtu.be" or host.endswith(".youtu.be"):
+            candidate = parts[0] if parts else None
+        elif host == "youtube.com" or host.endswith(".youtube.com"):
+            if parts[:1] == ["watch"]:
+                candidate = parse_qs(parsed.query).get("v", [None])[0]
+            elif len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                candidate = parts[1]
+
+        if candidate and cls.VIDEO_ID_PATTERN.match(candidate):
+            return candidate
+        return None
+
+    async def find_material(self, db: AsyncSession, video_id: str) -> Material | None:
+        """Find an imported material for the video whose audio is still on disk."""
+        result = await db.execute(
+            select(Material)
+            .where(
+                Material.source_type == "youtube",
+                Material.source_url.contains(video_id),
+            )
+            .order_by(Material.id)
+        )
+        for material in result.scalars().all():
+            if (
+                self.extract_video_id(material.source_url or "") == video_id
+                and Path(material.audio_path).exists()
+            ):
+                return material
+        return None
+
+    async def clone_material(
+        self, db: AsyncSession, source: Material, source_url: str
+    ) -> Material:
+        """Create a new material sharing the source's audio and segments.
+
+        Segment rows are copied with a single INSERT ... SELECT. The caller
+        owns the transaction and is responsible for committing.
+        """
+        material = Material(
+            title=source.title,
+            source_type="youtube",
+            source_url=source_url,
+            audio_path=source.audio_path,
+            duration=source.duration,
+            thumbnail_path=source.thumbnail_path,
+        )
+        db.add(material)
+        await db.flush()
+
+        columns = ["material_id", "text", "start_time", "end_time", "audio_path"]
+        await db.execute(
+            insert(Segment).from_select(
+                columns + ["order"],
+                select(
+                    literal(material.id),
+                    Segment.text,
+                    Segment.start_time,
+                    Segment.end_time,
+                    Segment.audio_path,
+                    Segment.order,
+                ).where(Segment.material_id == source.id),
+            )
+        )
+        await response_cache.bump(db, material.id)
+        await db.refresh(material)
+
+        return material
+
+    async def download(
+        self, url: str, on_progress: Callable[[float], None] | None = None
+    ) -> dict:
         """Download audio from YouTube URL using yt-dlp."""
         import yt_dlp
 
+        # Unique even for jobs started in the same second; yt-dlp would
+        # otherwise take the second file as already downloaded
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        output_template = str(settings.materials_dir / f"youtube_{timestamp}.%(ext)s")
+        stem = f"youtube_{timestamp}_{uuid.uuid4().hex[:8]}"
+        output_template = str(settings.materials_dir / f"{stem}.%(ext)s")
 
         ydl_opts = {
             'format': 'bestaudio[ext=m4a]/bestaudio/best',
@@ -28,6 +121,14 @@ class YouTubeService:
             'no_warnings': True,
         }
 
+        if on_progress:
+            def progress_hook(d: dict) -> None:
+                total = d.get("total_bytes") or d.get("total_bytes_estimate")
+                if d.get("status") == "downloading" and total:
+                    on_progress(d.get("downloaded_bytes", 0) / total)
+
+            ydl_opts['progress_hooks'] = [progress_hook]
+
         # Run in executor to avoid blocking
         loop = asyncio.get_event_loop()
         info = await loop.run_in_executor(
@@ -39,12 +140,12 @@ class YouTubeService:
         ext = info.get("ext", "m4a")
 
         # Find the downloaded audio file
-        audio_path = str(settings.materials_dir / f"youtube_{timestamp}.{ext}")
+        audio_path = str(settings.materials_dir / f"{stem}.{ext}")
 
         # Find thumbnail if exists
         thumbnail_path = None
         for ext in [".jpg", ".png", ".webp"]:
-            thumb_file = settings.materials_dir / f"youtube_{timestamp}{ext}"
+            thumb_file = settings.materials_dir / f"{stem}{ext}"
             if thumb_file.exists():
                 thumbnail_path = str(thumb_file)
                 break
@@ -74,7 +175,10 @@ class YouTubeService:
         thumbnail_path: str | None,
         segments: list[dict],
     ) -> Material:
-        """Save material and segments to database."""
+        """Save material and segments to database.
+
+        The caller owns the transaction and is responsible for committing.
+        """
         material = Material(
             title=title,
             source_type="youtube",
@@ -86,17 +190,117 @@ class YouTubeService:
         db.add(material)
         await db.flush()
 
-        for i, seg in enumerate(segments):
-            segment = Segment(
-                material_id=material.id,
-                text=seg["text"],
-                start_time=seg["start"],
-                end_time=seg["end"],
-                order=i,
-            )
-            db.add(segment)
-
-        await db.commit()
+        await insert_segments(db, material.id, segments)
+        await response_cache.bump(db, material.id)
         await db.refresh(material)
 
         return material
+
+    async def create_clips(
+        self,
+        db: AsyncSession,
+        material: Material,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> int:
+        """Cut every unclipped segment of a material into its own clip.
+
+        Stores each clip in ``Segment.audio_path``; segments whose clip
+        could not be cut keep playing from the material audio. The caller
+        commits. Returns the number of clips stored.
+        """
+        result = await db.execute(
+            select(Segment.id, Segment.start_time, Segment.end_time)
+            .where(Segment.material_id == material.id, Segment.audio_path.is_(None))
+            .order_by(Segment.order)
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+
+        clip_paths = await AudioService().extract_clips(
+            material.audio_path,
+            [(row.start_time, row.end_time) for row in rows],
+            on_progress=on_progress,
+        )
+
+        values = [
+            {"id": row.id, "audio_path": clip_path}
+            for row, clip_path in zip(rows, clip_paths)
+            if clip_path
+        ]
+        if values:
+            await db.execute(update(Segment), values)
+            await response_cache.bump(db, material.id)
+        return len(values)
+
+
+async def _download_stage(ctx: JobContext, db: AsyncSession) -> dict:
+    """Import stage 1: download audio and thumbnail.
+
+    If the same video was imported while this job was queued, its material
+    is reused instead of downloading again.
+    """
+    youtube_service = YouTubeService()
+    video_id = ctx.payload.get("video_id")
+    if video_id:
+        existing = await youtube_service.find_material(db, video_id)
+        if existing:
+            return {"source_material_id": existing.id}
+
+    return await youtube_service.download(ctx.payload["url"], on_progress=ctx.report)
+
+
+async def _transcribe_stage(ctx: JobContext, db: AsyncSession) -> dict:
+    """Import stage 2: transcribe the downloaded audio into segments."""
+    if "source_material_id" in ctx.state["download"]:
+        return {"segments": []}
+
+    segments = await TranscribeService().transcribe(
+        ctx.state["download"]["audio_path"], on_progress=ctx.report
+    )
+    return {"segments": segments}
+
+
+async def _save_stage(ctx: JobContext, db: AsyncSession) -> dict:
+    """Import stage 3: save material and segments."""
+    download = ctx.state["download"]
+
+    if "source_material_id" in download:
+        source = await db.get(Material, download["source_material_id"])
+        if source is None:
+            raise ValueError("Reused material was deleted during import")
+        material = await YouTubeService().clone_material(db, source, ctx.payload["url"])
+        return {"material_id": material.id}
+
+    material = await YouTubeService().save_material(
+        db=db,
+        title=download["title"],
+        source_url=ctx.payload["url"],
+        audio_path=download["audio_path"],
+        duration=download["duration"],
+        thumbnail_path=download.get("thumbnail_path"),
+        segments=ctx.state["transcribe"]["segments"],
+    )
+    return {"material_id": material.id}
+
+
+async def _clip_stage(ctx: JobContext, db: AsyncSession) -> dict:
+    """Import stage 4: cut each segment into its own small clip."""
+    material = await db.get(Material, ctx.state["save"]["material_id"])
+    if material is None:
+        raise ValueError("Material was deleted during import")
+
+    clips = await YouTubeService().create_clips(db, material, on_progress=ctx.report)
+    return {"clips": clips}
+
+
+# (name, progress weight, stage) for the "youtube" job pipeline
+YOUTUBE_IMPORT_STAGES = [
+    ("download", 0.2, _download_stage),
+    ("transcribe", 0.7, _transcribe_stage),
+    ("save", 0.05, _save_stage),
+    ("clip", 0.05, _clip_stage),
+]
+
+# Stage outputs dropped once an import ends (the transcript is in segments)
+YOUTUBE_TRANSIENT_STAGES = ("transcribe",)
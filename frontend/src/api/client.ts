@@ -30,8 +30,25 @@ export interface Segment {
   order: number;
 }
 
-export interface MaterialDetail extends Material {
+export interface MaterialSummary extends Material {
+  segment_count: number;
+  practice_count: number;
+}
+
+export interface MaterialPage {
+  items: MaterialSummary[];
+  next_cursor: string | null;
+}
+
+export interface SegmentPage {
+  items: Segment[];
+  next_after_order: number | null;
+}
+
+// Includes the first page of segments; fetch the rest with materialsApi.segments
+export interface MaterialDetail extends MaterialSummary {
   segments: Segment[];
+  next_after_order: number | null;
 }
 
 export interface Practice {
@@ -51,15 +68,64 @@ export interface Evaluation {
   overall_feedback: string;
   strengths: string[];
   areas_to_improve: string[];
+  wer?: number;
+  cer?: number;
+  word_alignment?: WordAlignment[];
+}
+
+export interface WordAlignment {
+  op: "match" | "substitution" | "deletion" | "insertion";
+  reference: string | null;
+  hypothesis: string | null;
+}
+
+export interface EvaluationResponse {
+  practice_id: number;
+  transcribed_text: string;
+  original_text: string;
+  evaluation: Evaluation;
+}
+
+export type EvaluationStreamEvent =
+  | {
+      event: "transcription";
+      data: { practice_id: number; transcribed_text: string; original_text: string };
+    }
+  | { event: "accuracy"; data: { accuracy_score: number; wer: number; cer: number } }
+  | { event: "token"; data: { text: string } }
+  | { event: "evaluation"; data: EvaluationResponse };
+
+export interface Job {
+  id: number;
+  kind: string;
+  status: "pending" | "running" | "completed" | "failed";
+  stage: string | null;
+  progress: number;
+  material_id: number | null;
+  error: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface YouTubeImportResult {
+  job_id: number;
+  status: Job["status"];
+  material_id: number | null;
+  message: string;
 }
 
 // API functions
 export const materialsApi = {
-  list: () => apiClient.get<Material[]>("/api/materials"),
+  list: (cursor?: string) =>
+    apiClient.get<MaterialPage>("/api/materials", { params: { cursor } }),
   get: (id: number) => apiClient.get<MaterialDetail>(`/api/materials/${id}`),
+  segments: (id: number, afterOrder?: number) =>
+    apiClient.get<SegmentPage>(`/api/materials/${id}/segments`, {
+      params: { after_order: afterOrder },
+    }),
   delete: (id: number) => apiClient.delete(`/api/materials/${id}`),
   importYoutube: (url: string) =>
-    apiClient.post("/api/materials/youtube", { url }),
+    apiClient.post<YouTubeImportResult>("/api/materials/youtube", { url }),
   importPdf: (file: File) => {
     const formData = new FormData();
     formData.append("file", file);
@@ -69,9 +135,15 @@ export const materialsApi = {
   },
 };
 
+export const jobsApi = {
+  get: (id: number) => apiClient.get<Job>(`/api/jobs/${id}`),
+};
+
 export const practiceApi = {
-  getSegmentAudio: (segmentId: number) =>
-    `${API_BASE_URL}/api/segments/${segmentId}/audio`,
+  // full: the whole material audio, to be played as a region of it;
+  // otherwise the segment's own clip
+  getSegmentAudio: (segmentId: number, full = false) =>
+    `${API_BASE_URL}/api/segments/${segmentId}/audio${full ? "?full=1" : ""}`,
   uploadRecording: (segmentId: number, audioBlob: Blob) => {
     const formData = new FormData();
     formData.append("file", audioBlob, "recording.webm");
@@ -85,10 +157,42 @@ export const practiceApi = {
   listPractices: (segmentId: number) =>
     apiClient.get<Practice[]>(`/api/segments/${segmentId}/practices`),
   evaluate: (practiceId: number) =>
+    apiClient.post<EvaluationResponse>(`/api/practice/${practiceId}/evaluate`),
+  // Streams partial results (transcription first) over Server-Sent Events
+  evaluateStream: (
+    practiceId: number,
+    onEvent: (event: EvaluationStreamEvent) => void
+  ) =>
+    new Promise<EvaluationResponse>((resolve, reject) => {
+      const source = new EventSource(
+        `${API_BASE_URL}/api/practice/${practiceId}/evaluate/stream`
+      );
+      const names = ["transcription", "accuracy", "token", "evaluation"] as const;
+      for (const name of names) {
+        source.addEventListener(name, (message) => {
+          const data = JSON.parse((message as MessageEvent).data);
+          onEvent({ event: name, data } as EvaluationStreamEvent);
+          if (name === "evaluation") {
+            source.close();
+            resolve(data);
+          }
+        });
+      }
+      source.addEventListener("error", (message) => {
+        // Server-sent "error" events carry a detail; connection errors do not
+        const data = (message as MessageEvent).data;
+        source.close();
+        reject(new Error(data ? JSON.parse(data).detail : "Evaluation stream failed"));
+      });
+    }),
+  evaluateBatch: (practiceIds: number[]) =>
     apiClient.post<{
-      practice_id: number;
-      transcribed_text: string;
-      original_text: string;
-      evaluation: Evaluation;
-    }>(`/api/practice/${practiceId}/evaluate`),
+      results: {
+        practice_id: number;
+        transcribed_text: string | null;
+        original_text: string | null;
+        evaluation: Evaluation | null;
+        error: string | null;
+      }[];
+    }>("/api/practice/evaluate-batch", { practice_ids: practiceIds }),
 };
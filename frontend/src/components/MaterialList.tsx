@@ -1,4 +1,8 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import {
+  useInfiniteQuery,
+  useMutation,
+  useQueryClient,
+} from "@tanstack/react-query";
 import { materialsApi } from "@/api/client";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -11,10 +15,15 @@ interface MaterialListProps {
 export function MaterialList({ onSelectMaterial }: MaterialListProps) {
   const queryClient = useQueryClient();
 
-  const { data: materials, isLoading } = useQuery({
-    queryKey: ["materials"],
-    queryFn: () => materialsApi.list().then((res) => res.data),
-  });
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } =
+    useInfiniteQuery({
+      queryKey: ["materials"],
+      queryFn: ({ pageParam }) =>
+        materialsApi.list(pageParam).then((res) => res.data),
+      initialPageParam: undefined as string | undefined,
+      getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    });
+  const materials = data?.pages.flatMap((page) => page.items);
 
   const deleteMutation = useMutation({
     mutationFn: (id: number) => materialsApi.delete(id),
@@ -60,46 +69,62 @@ export function MaterialList({ onSelectMaterial }: MaterialListProps) {
   }
 
   return (
-    <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
-      {materials.map((material) => (
-        <Card key={material.id} className="overflow-hidden">
-          <CardHeader className="pb-3">
-            <div className="flex items-start justify-between gap-2">
-              <div className="flex items-center gap-2">
-                {getSourceIcon(material.source_type)}
-                <CardTitle className="text-lg line-clamp-2">
-                  {material.title}
-                </CardTitle>
+    <div className="space-y-4">
+      <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
+        {materials.map((material) => (
+          <Card key={material.id} className="overflow-hidden">
+            <CardHeader className="pb-3">
+              <div className="flex items-start justify-between gap-2">
+                <div className="flex items-center gap-2">
+                  {getSourceIcon(material.source_type)}
+                  <CardTitle className="text-lg line-clamp-2">
+                    {material.title}
+                  </CardTitle>
+                </div>
               </div>
-            </div>
-          </CardHeader>
-          <CardContent>
-            <div className="flex items-center justify-between">
-              <span className="text-sm text-muted-foreground">
-                {formatDuration(material.duration)}
-              </span>
-              <div className="flex gap-2">
-                <Button
-                  variant="outline"
-                  size="sm"
-                  onClick={() => onSelectMaterial(material.id)}
-                >
-                  <Play className="h-4 w-4 mr-1" />
-                  Practice
-                </Button>
-                <Button
-                  variant="ghost"
-                  size="icon"
-                  onClick={() => deleteMutation.mutate(material.id)}
-                  disabled={deleteMutation.isPending}
-                >
-                  <Trash2 className="h-4 w-4 text-destructive" />
-                </Button>
+            </CardHeader>
+            <CardContent>
+              <div className="flex items-center justify-between">
+                <span className="text-sm text-muted-foreground">
+                  {formatDuration(material.duration)} ·{" "}
+                  {material.segment_count} segments
+                  {material.practice_count > 0 &&
+                    ` · ${material.practice_count} practices`}
+                </span>
+                <div className="flex gap-2">
+                  <Button
+                    variant="outline"
+                    size="sm"
+                    onClick={() => onSelectMaterial(material.id)}
+                  >
+                    <Play className="h-4 w-4 mr-1" />
+                    Practice
+                  </Button>
+                  <Button
+                    variant="ghost"
+                    size="icon"
+                    onClick={() => deleteMutation.mutate(material.id)}
+                    disabled={deleteMutation.isPending}
+                  >
+                    <Trash2 className="h-4 w-4 text-destructive" />
+                  </Button>
+                </div>
               </div>
-            </div>
-          </CardContent>
-        </Card>
-      ))}
+            </CardContent>
+          </Card>
+        ))}
+      </div>
+      {hasNextPage && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+          >
+            {isFetchingNextPage ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
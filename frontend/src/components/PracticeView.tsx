@@ -1,6 +1,7 @@
-import { useState } from "react";
-import { useQuery, useMutation } from "@tanstack/react-query";
+import { useEffect, useState } from "react";
+import { useQuery, useInfiniteQuery, useMutation } from "@tanstack/react-query";
 import { materialsApi, practiceApi } from "@/api/client";
+import type { EvaluationStreamEvent } from "@/api/client";
 import { WaveformPlayer } from "./WaveformPlayer";
 import { Recorder } from "./Recorder";
 import { EvaluationResult } from "./EvaluationResult";
@@ -9,6 +10,9 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { ArrowLeft, ChevronLeft, ChevronRight } from "lucide-react";
 import { cn } from "@/lib/utils";
 
+// Load the next page of segments when this close to the last loaded one
+const SEGMENT_PREFETCH = 10;
+
 interface PracticeViewProps {
   materialId: number;
   onBack: () => void;
@@ -23,6 +27,37 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
     queryFn: () => materialsApi.get(materialId).then((res) => res.data),
   });
 
+  // Segments after the first page, loaded as navigation approaches them
+  const moreSegments = useInfiniteQuery({
+    queryKey: ["segments", materialId],
+    queryFn: ({ pageParam }) =>
+      materialsApi.segments(materialId, pageParam).then((res) => res.data),
+    initialPageParam: material?.next_after_order ?? undefined,
+    getNextPageParam: (lastPage) => lastPage.next_after_order ?? undefined,
+    enabled: material?.next_after_order != null,
+  });
+  const segments = [
+    ...(material?.segments ?? []),
+    ...(moreSegments.data?.pages.flatMap((page) => page.items) ?? []),
+  ];
+
+  const { hasNextPage, isFetchingNextPage, fetchNextPage } = moreSegments;
+  useEffect(() => {
+    if (
+      hasNextPage &&
+      !isFetchingNextPage &&
+      currentSegmentIndex >= segments.length - SEGMENT_PREFETCH
+    ) {
+      fetchNextPage();
+    }
+  }, [
+    currentSegmentIndex,
+    segments.length,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  ]);
+
   const uploadMutation = useMutation({
     mutationFn: ({
       segmentId,
@@ -33,8 +68,31 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
     }) => practiceApi.uploadRecording(segmentId, blob),
   });
 
+  // Partial results shown while the evaluation stream is running
+  const [liveResult, setLiveResult] = useState<{
+    originalText: string;
+    transcribedText: string;
+    accuracy: number | null;
+  } | null>(null);
+
+  const handleEvaluationEvent = (event: EvaluationStreamEvent) => {
+    if (event.event === "transcription") {
+      setLiveResult({
+        originalText: event.data.original_text,
+        transcribedText: event.data.transcribed_text,
+        accuracy: null,
+      });
+    } else if (event.event === "accuracy") {
+      const accuracy = event.data.accuracy_score;
+      setLiveResult((prev) => (prev ? { ...prev, accuracy } : prev));
+    }
+  };
+
   const evaluateMutation = useMutation({
-    mutationFn: (practiceId: number) => practiceApi.evaluate(practiceId),
+    mutationFn: (practiceId: number) => {
+      setLiveResult(null);
+      return practiceApi.evaluateStream(practiceId, handleEvaluationEvent);
+    },
   });
 
   const handleRecordingComplete = async (blob: Blob) => {
@@ -49,7 +107,12 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
     await evaluateMutation.mutateAsync(uploadResult.data.id);
   };
 
-  if (isLoading || !material) {
+  const currentSegment = segments[currentSegmentIndex];
+  // The current segment is on a page that is loading or about to load
+  const segmentPending =
+    !currentSegment && (hasNextPage || isFetchingNextPage);
+
+  if (isLoading || !material || segmentPending) {
     return (
       <div className="flex items-center justify-center p-8">
         <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-primary"></div>
@@ -57,9 +120,31 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
     );
   }
 
-  const currentSegment = material.segments[currentSegmentIndex];
-  const hasNext = currentSegmentIndex < material.segments.length - 1;
+  if (!currentSegment) {
+    return (
+      <div className="space-y-6">
+        <div className="flex items-center gap-4">
+          <Button variant="ghost" size="icon" onClick={onBack}>
+            <ArrowLeft className="h-5 w-5" />
+          </Button>
+          <h2 className="text-xl font-semibold">{material.title}</h2>
+        </div>
+        <div className="text-center p-8 text-muted-foreground">
+          {material.segment_count === 0 ? (
+            <p>This material has no segments to practice.</p>
+          ) : (
+            <p>This segment could not be loaded.</p>
+          )}
+        </div>
+      </div>
+    );
+  }
+
+  const hasNext = currentSegmentIndex < material.segment_count - 1;
   const hasPrev = currentSegmentIndex > 0;
+  // Segments with their own audio file play it whole; the others request
+  // the full material audio so the start/end region always matches it
+  const hasClip = Boolean(currentSegment.audio_path);
 
   const speedOptions = [0.5, 0.75, 1.0, 1.25, 1.5];
 
@@ -73,7 +158,7 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
         <div>
           <h2 className="text-xl font-semibold">{material.title}</h2>
           <p className="text-sm text-muted-foreground">
-            Segment {currentSegmentIndex + 1} of {material.segments.length}
+            Segment {currentSegmentIndex + 1} of {material.segment_count}
           </p>
         </div>
       </div>
@@ -89,7 +174,7 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
           <ChevronLeft className="h-5 w-5" />
         </Button>
         <div className="flex gap-1">
-          {material.segments.map((_, index) => (
+          {segments.map((_, index) => (
             <button
               key={index}
               onClick={() => setCurrentSegmentIndex(index)}
@@ -144,10 +229,10 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
         </CardHeader>
         <CardContent>
           <WaveformPlayer
-            audioUrl={practiceApi.getSegmentAudio(currentSegment.id)}
+            audioUrl={practiceApi.getSegmentAudio(currentSegment.id, !hasClip)}
             playbackSpeed={playbackSpeed}
-            startTime={currentSegment.start_time}
-            endTime={currentSegment.end_time}
+            startTime={hasClip ? undefined : currentSegment.start_time}
+            endTime={hasClip ? undefined : currentSegment.end_time}
           />
         </CardContent>
       </Card>
@@ -166,12 +251,32 @@ export function PracticeView({ materialId, onBack }: PracticeViewProps) {
       </Card>
 
       {/* Evaluation Result */}
-      {evaluateMutation.data && (
+      {evaluateMutation.data ? (
         <EvaluationResult
-          originalText={evaluateMutation.data.data.original_text}
-          transcribedText={evaluateMutation.data.data.transcribed_text}
-          evaluation={evaluateMutation.data.data.evaluation}
+          originalText={evaluateMutation.data.original_text}
+          transcribedText={evaluateMutation.data.transcribed_text}
+          evaluation={evaluateMutation.data.evaluation}
         />
+      ) : (
+        evaluateMutation.isPending &&
+        liveResult && (
+          <Card>
+            <CardHeader>
+              <CardTitle className="text-lg">
+                Your Speech
+                {liveResult.accuracy !== null && (
+                  <span className="ml-2 text-sm font-normal text-muted-foreground">
+                    ~{liveResult.accuracy}% match
+                  </span>
+                )}
+              </CardTitle>
+            </CardHeader>
+            <CardContent className="space-y-2">
+              <p>{liveResult.transcribedText}</p>
+              <p className="text-sm text-muted-foreground">Generating feedback...</p>
+            </CardContent>
+          </Card>
+        )
       )}
     </div>
   );
@@ -1,23 +1,52 @@
-import { useState } from "react";
-import { useMutation, useQueryClient } from "@tanstack/react-query";
-import { materialsApi } from "@/api/client";
+import { useEffect, useState } from "react";
+import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
+import { jobsApi, materialsApi } from "@/api/client";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Youtube, Loader2 } from "lucide-react";
 
+const STAGE_LABELS: Record<string, string> = {
+  download: "Downloading",
+  transcribe: "Transcribing",
+  save: "Saving",
+  clip: "Cutting clips",
+};
+
 export function YouTubeImport() {
   const [url, setUrl] = useState("");
+  const [jobId, setJobId] = useState<number | null>(null);
   const queryClient = useQueryClient();
 
   const importMutation = useMutation({
     mutationFn: (url: string) => materialsApi.importYoutube(url),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["materials"] });
+    onSuccess: (res) => {
+      setJobId(res.data.job_id);
       setUrl("");
     },
   });
 
+  // Poll the import job until it finishes
+  const { data: job } = useQuery({
+    queryKey: ["job", jobId],
+    queryFn: () => jobsApi.get(jobId!).then((res) => res.data),
+    enabled: jobId !== null,
+    refetchInterval: (query) => {
+      const status = query.state.data?.status;
+      return status === "completed" || status === "failed" ? false : 1000;
+    },
+  });
+
+  useEffect(() => {
+    if (job?.status === "completed") {
+      queryClient.invalidateQueries({ queryKey: ["materials"] });
+    }
+  }, [job?.status, queryClient]);
+
+  const isRunning =
+    importMutation.isPending ||
+    (job !== undefined && job.status !== "completed" && job.status !== "failed");
+
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
     if (url.trim()) {
@@ -40,11 +69,11 @@ export function YouTubeImport() {
             placeholder="https://www.youtube.com/watch?v=..."
             value={url}
             onChange={(e) => setUrl(e.target.value)}
-            disabled={importMutation.isPending}
+            disabled={isRunning}
             className="flex-1"
           />
-          <Button type="submit" disabled={importMutation.isPending || !url.trim()}>
-            {importMutation.isPending ? (
+          <Button type="submit" disabled={isRunning || !url.trim()}>
+            {isRunning ? (
               <>
                 <Loader2 className="h-4 w-4 mr-2 animate-spin" />
                 Importing...
@@ -54,12 +83,18 @@ export function YouTubeImport() {
             )}
           </Button>
         </form>
-        {importMutation.isError && (
+        {isRunning && job && (
+          <p className="text-sm text-muted-foreground mt-2">
+            {(job.stage && STAGE_LABELS[job.stage]) || "Queued"}...{" "}
+            {Math.round(job.progress * 100)}%
+          </p>
+        )}
+        {(importMutation.isError || job?.status === "failed") && (
           <p className="text-sm text-destructive mt-2">
             Failed to import. Please check the URL and try again.
           </p>
         )}
-        {importMutation.isSuccess && (
+        {job?.status === "completed" && (
           <p className="text-sm text-green-600 mt-2">
             Successfully imported!
           </p>